@@ -1,55 +1,241 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.models import Group
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.http import Http404, HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.functional import cached_property
 
+from . import bulk
+from .forms import MoveCategoryForm
 from .models import Category, Comment, Location, Post
 
 admin.site.unregister(Group)
 
+# С какого размера таблицы точный COUNT(*) заменяется оценкой.
+ESTIMATE_COUNT_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, оценивающий размер большой таблицы без COUNT(*).
+
+    Оценка берётся только для списка без фильтров и только если в нём
+    больше ESTIMATE_COUNT_THRESHOLD строк — это проверяет COUNT(*) с
+    LIMIT. Число строк берётся из статистики планировщика: pg_class в
+    PostgreSQL, sqlite_stat1 после ANALYZE в SQLite, information_schema
+    в MySQL. Без статистики список считается точно.
+    """
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if not query.where and self.exceeds_threshold():
+            estimate = self.estimate(query.get_meta())
+            if estimate and estimate > ESTIMATE_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+    def exceeds_threshold(self):
+        """Больше ли в списке строк, чем порог; читает не больше порога."""
+        limited = self.object_list.order_by()[:ESTIMATE_COUNT_THRESHOLD + 1]
+        return limited.count() > ESTIMATE_COUNT_THRESHOLD
+
+    @staticmethod
+    def estimate(opts):
+        queries = {
+            'postgresql': 'SELECT reltuples::bigint FROM pg_class '
+                          'WHERE relname = %s',
+            # Первое число stat — строк в таблице на момент ANALYZE.
+            'sqlite': "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 "
+                      "WHERE tbl = %s LIMIT 1",
+            'mysql': 'SELECT table_rows FROM information_schema.tables '
+                     'WHERE table_schema = DATABASE() AND table_name = %s',
+        }
+        if connection.vendor not in queries:
+            return None
+        with connection.cursor() as cursor:
+            try:
+                cursor.execute(queries[connection.vendor], [opts.db_table])
+            except DatabaseError:
+                # sqlite_stat1 появляется только после первого ANALYZE.
+                return None
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+
+class ListDisplayChangeList(ChangeList):
+    """Список объектов, загружающий только поля модели из list_display.
+
+    Поля связанных объектов, нужные их строковому представлению,
+    перечисляются в list_related_fields админки; без них связанные
+    объекты загружаются целиком.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        fields = list(self.model_admin.list_related_fields)
+        for name in self.list_display:
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                fields.append(name)
+        return queryset.only(*fields) if fields else queryset
+
 
 class BaseAdmin(admin.ModelAdmin):
     """Общие настройки для админки."""
 
     list_editable = ('is_published',)
     list_filter = ('is_published',)
-    search_fields = ('title', 'description', 'name', 'text')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'updated_at')
     ordering = ['created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_in_batches',)
+    # Поля связанных объектов для списка (см. ListDisplayChangeList).
+    list_related_fields = ()
+
+    def get_changelist(self, request, **kwargs):
+        return ListDisplayChangeList
 
-    def get_list_display(self, request):
-        list_display = [
-            field.name for field in self.model._meta.fields
-            if field.name != 'id'
-        ]
-        if hasattr(self.model, 'is_published'):
-            list_display.append('is_published')
-        return list_display
+    def get_actions(self, request):
+        # Стандартное удаление собирает все связанные объекты на одной
+        # странице подтверждения; вместо него — удаление порциями.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                'bulk/<str:task_id>/',
+                self.admin_site.admin_view(self.bulk_progress_view),
+                name=f'{opts.app_label}_{opts.model_name}_bulk',
+            ),
+        ] + super().get_urls()
+
+    def run_bulk(self, request, queryset, operation, label):
+        task_id = bulk.start(queryset, operation, label)
+        if task_id is None:
+            self.message_user(request, f'{label}: готово.', messages.SUCCESS)
+            return None
+        opts = self.model._meta
+        return HttpResponseRedirect(reverse(
+            f'admin:{opts.app_label}_{opts.model_name}_bulk',
+            args=[task_id]
+        ))
+
+    def confirm_bulk(self, request, queryset, label, form=None):
+        """Страница подтверждения, повторно отправляющая выбор действия."""
+        return TemplateResponse(request, 'admin/blog/bulk_confirm.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': label,
+            'count': queryset.count(),
+            'form': form,
+            'action': request.POST['action'],
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+        })
+
+    def bulk_progress_view(self, request, task_id):
+        progress = bulk.get_progress(task_id)
+        if progress is None:
+            raise Http404
+        return TemplateResponse(request, 'admin/blog/bulk_progress.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': progress['label'],
+            'progress': progress,
+        })
+
+    @admin.action(
+        description='Удалить выбранные порциями', permissions=('delete',)
+    )
+    def delete_in_batches(self, request, queryset):
+        label = f'Удаление: {self.model._meta.verbose_name_plural}'
+        if 'apply' not in request.POST:
+            return self.confirm_bulk(request, queryset, label)
+        return self.run_bulk(
+            request, queryset, bulk.delete_objects(self.model), label
+        )
 
 
 @admin.register(Post)
 class PostAdmin(BaseAdmin):
-    list_display = ('title', 'author', 'created_at', 'is_published')
-    list_editable = ('is_published',)
+    list_display = ('title', 'author', 'category', 'created_at',
+                    'is_published')
+    list_select_related = ('author', 'category')
+    list_related_fields = ('author__username', 'category__title',
+                           'category__created_at')
     list_filter = ('is_published', 'category')
-    search_fields = ('title', 'description', 'text')
+    search_fields = ('title', '=author__username')
+    autocomplete_fields = ('author', 'category', 'location')
+    actions = ('publish', 'unpublish', 'move_to_category',
+               'delete_in_batches')
+
+    @admin.action(
+        description='Опубликовать выбранные', permissions=('change',)
+    )
+    def publish(self, request, queryset):
+        return self.run_bulk(
+            request, queryset, bulk.update_objects(Post, is_published=True),
+            'Публикация постов'
+        )
+
+    @admin.action(description='Снять с публикации', permissions=('change',))
+    def unpublish(self, request, queryset):
+        return self.run_bulk(
+            request, queryset, bulk.update_objects(Post, is_published=False),
+            'Снятие постов с публикации'
+        )
+
+    @admin.action(
+        description='Перенести в другую категорию', permissions=('change',)
+    )
+    def move_to_category(self, request, queryset):
+        label = 'Перенос постов в категорию'
+        form = MoveCategoryForm(request.POST if 'apply' in request.POST
+                                else None)
+        if not form.is_valid():
+            return self.confirm_bulk(request, queryset, label, form)
+        return self.run_bulk(
+            request, queryset,
+            bulk.update_objects(Post, category=form.cleaned_data['category']),
+            label
+        )
 
 
 @admin.register(Comment)
 class CommentAdmin(BaseAdmin):
     list_display = ('post', 'author', 'created_at', 'text')
-    search_fields = ('text', 'author__username', 'post__title')
-    list_filter = ('author', 'created_at')
+    list_select_related = ('post', 'author')
+    list_related_fields = ('post__title', 'post__created_at',
+                           'author__username')
+    search_fields = ('=author__username', 'post__title')
+    list_filter = ('created_at',)
     list_editable = ('text',)
+    autocomplete_fields = ('post', 'author')
+    # Перенос в другую ветку потребовал бы пересчёта путей поддерева.
+    readonly_fields = (*BaseAdmin.readonly_fields, 'parent')
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('title', 'description')
-    search_fields = ('title', 'description')
-    list_filter = ('title',)
+    list_display = ('title', 'slug', 'is_published')
+    search_fields = ('title', 'slug')
+    list_filter = ('is_published',)
 
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
-    list_display = ('name',)
+    list_display = ('name', 'is_published')
     search_fields = ('name',)
-    list_filter = ('name',)
+    list_filter = ('is_published',)
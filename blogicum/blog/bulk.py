@@ -0,0 +1,97 @@
+"""Массовые операции над постами и комментариями порциями.
+
+Каждая порция — отдельная короткая транзакция, поэтому даже большая
+операция не держит блокировку БД надолго. Большие выборки выполняются
+в фоновом потоке, а ход выполнения хранится в кэше: страницу хода
+выполнения видят все воркеры, только если кэш общий (см. blog.checks).
+"""
+import logging
+import threading
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+BATCH_SIZE = 500
+# С какого числа объектов операция уходит в фоновый поток.
+BACKGROUND_THRESHOLD = 2000
+PROGRESS_TIMEOUT = 24 * 60 * 60
+# Через сколько секунд без обновлений задача считается остановленной:
+# воркер с её потоком перезапустили или убили.
+STALE_AFTER = 5 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def update_objects(model, **values):
+    """Операция для run_in_batches: массовый UPDATE порции."""
+    def operation(batch):
+        model.objects.filter(pk__in=batch).update(**values)
+    return operation
+
+
+def delete_objects(model):
+    """Операция для run_in_batches: удаление порции с каскадом."""
+    def operation(batch):
+        model.objects.filter(pk__in=batch).delete()
+    return operation
+
+
+def run_in_batches(pks, operation, progress=None):
+    """Применяет operation к первичным ключам порциями по BATCH_SIZE."""
+    done = 0
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = pks[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            operation(batch)
+        done += len(batch)
+        if progress:
+            progress(done)
+    return done
+
+
+def progress_key(task_id):
+    return f'bulk-task:{task_id}'
+
+
+def get_progress(task_id):
+    state = cache.get(progress_key(task_id))
+    if (state and state['status'] == 'running'
+            and time.time() - state['updated_at'] > STALE_AFTER):
+        return {**state, 'status': 'stalled'}
+    return state
+
+
+def start(queryset, operation, label):
+    """Выполняет операцию сразу или в фоне; для фона возвращает id задачи."""
+    pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+    if len(pks) < BACKGROUND_THRESHOLD:
+        run_in_batches(pks, operation)
+        return None
+    task_id = uuid.uuid4().hex
+    state = {'label': label, 'total': len(pks), 'done': 0,
+             'status': 'running', 'updated_at': time.time()}
+    cache.set(progress_key(task_id), state, PROGRESS_TIMEOUT)
+
+    def progress(done):
+        cache.set(progress_key(task_id),
+                  {**state, 'done': done, 'updated_at': time.time()},
+                  PROGRESS_TIMEOUT)
+
+    def work():
+        status = 'done'
+        try:
+            run_in_batches(pks, operation, progress)
+        except Exception:
+            logger.exception('Массовая операция %s прервана', label)
+            status = 'failed'
+        finally:
+            connection.close()
+        current = cache.get(progress_key(task_id)) or state
+        cache.set(progress_key(task_id),
+                  {**current, 'status': status, 'updated_at': time.time()},
+                  PROGRESS_TIMEOUT)
+
+    threading.Thread(target=work, daemon=True).start()
+    return task_id
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+# Бэкенды, у которых у каждого процесса свой кэш.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Ход фоновых массовых операций должен быть виден всем воркерам."""
+    if settings.DEBUG:
+        return []
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            'Кэш по умолчанию не общий для воркеров: ход фоновых '
+            'массовых операций в админке виден только воркеру, который '
+            'их выполняет.',
+            hint='Задайте общий кэш через BLOGICUM_CACHE_BACKEND и '
+                 'BLOGICUM_CACHE_LOCATION.',
+            id='blog.W001',
+        )
+    ]
@@ -0,0 +1,247 @@
+"""Отложенная запись комментариев через локальную очередь на диске.
+
+Комментарий после проверки формы дописывается строкой JSON в файл
+очереди с fsync и сразу виден автору как ожидающий. Команда
+flush_comments забирает накопившийся файл целиком и вставляет
+комментарии порциями через bulk_create: одна транзакция SQLite вместо
+отдельной транзакции на каждый комментарий.
+
+Пишущие процессы и воркер согласуются через flock на отдельном файле
+блокировки. Воркер переименовывает файл очереди и удаляет его только
+после коммита; незавершённые файлы подхватываются при следующем запуске,
+а уже вставленные комментарии узнаются по времени создания.
+
+Для показа автору каждая запись дублируется в маленький файл своей пары
+(пост, автор) в каталоге pending: страница поста читает только его и без
+блокировки, сколько бы ни накопилось в очереди.
+"""
+import fcntl
+import json
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core import metrics
+
+from .models import AuthorStats, Change, Comment, Post, User
+from .tracking import bulk_create_with_timestamps
+
+QUEUE_FILE = 'queue.jsonl'
+LOCK_FILE = 'queue.lock'
+WORKER_LOCK_FILE = 'worker.lock'
+CLAIMED_PREFIX = 'claimed-'
+PENDING_DIR = 'pending'
+BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def locked(name=LOCK_FILE):
+    """Исключительная блокировка каталога очереди."""
+    root = settings.COMMENT_QUEUE_ROOT
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, name), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield root
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def enqueue(post_id, author_id, text, parent_id=None):
+    """Дописывает комментарий в очередь; после возврата он на диске."""
+    entry = {
+        'id': uuid.uuid4().hex,
+        'post_id': post_id,
+        'author_id': author_id,
+        'parent_id': parent_id,
+        'text': text,
+        'created_at': timezone.now().isoformat(),
+    }
+    line = json.dumps(entry, ensure_ascii=False) + '\n'
+    with locked() as root:
+        with open(os.path.join(root, QUEUE_FILE), 'a',
+                  encoding='utf-8') as queue:
+            queue.write(line)
+            queue.flush()
+            os.fsync(queue.fileno())
+        # Копия только для показа: после сбоя её поправит flush.
+        path = pending_path(post_id, author_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as index:
+            index.write(line)
+    return entry
+
+
+def read_entries(path):
+    """Записи файла очереди; оборванная при сбое строка пропускается."""
+    try:
+        with open(path, encoding='utf-8') as queue:
+            lines = queue.readlines()
+    except FileNotFoundError:
+        return []
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            logger.warning('Пропущена повреждённая строка очереди %s', path)
+    return entries
+
+
+def queue_files(root):
+    """Файлы с ещё не записанными в БД комментариями, старые первыми."""
+    claimed = sorted(
+        name for name in os.listdir(root) if name.startswith(CLAIMED_PREFIX)
+    )
+    return [os.path.join(root, name) for name in (*claimed, QUEUE_FILE)]
+
+
+def pending_path(post_id, author_id):
+    return os.path.join(
+        settings.COMMENT_QUEUE_ROOT, PENDING_DIR,
+        f'{post_id}-{author_id}.jsonl'
+    )
+
+
+def pending(post_id, author_id):
+    """Ожидающие записи комментарии автора к посту.
+
+    Файл пары дописывается целыми строками и заменяется атомарно, поэтому
+    читается без блокировки; недописанную строку read_entries пропустит.
+    """
+    return read_entries(pending_path(post_id, author_id))
+
+
+def forget(entries):
+    """Убирает записанные в БД комментарии из файлов пар."""
+    written = {}
+    for entry in entries:
+        key = (entry['post_id'], entry['author_id'])
+        written.setdefault(key, set()).add(entry['id'])
+    with locked():
+        for key, ids in written.items():
+            path = pending_path(*key)
+            rest = [
+                entry for entry in read_entries(path) if entry['id'] not in ids
+            ]
+            if not rest:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as index:
+                index.writelines(
+                    json.dumps(entry, ensure_ascii=False) + '\n'
+                    for entry in rest
+                )
+            os.replace(f'{path}.tmp', path)
+
+
+def claim():
+    """Забирает текущий файл очереди у пишущих процессов.
+
+    Возвращает все забранные, но ещё не записанные файлы, включая
+    оставшиеся от прерванного запуска.
+    """
+    with locked() as root:
+        path = os.path.join(root, QUEUE_FILE)
+        if os.path.exists(path) and os.path.getsize(path):
+            os.rename(path, os.path.join(
+                root, f'{CLAIMED_PREFIX}{timezone.now():%Y%m%d%H%M%S%f}.jsonl'
+            ))
+        return queue_files(root)[:-1]
+
+
+def insert_batch(entries):
+    """Вставляет порцию комментариев одной транзакцией.
+
+    Комментарии к удалённым постам, от удалённых авторов и ответы на
+    комментарии из другого поста отбрасываются с записью в лог, ответы
+    на удалённые комментарии становятся корнями веток; уже вставленные
+    при прошлом запуске — пропускаются.
+    """
+    now = timezone.now()
+    comments = {
+        entry['id']: Comment(
+            post_id=entry['post_id'],
+            author_id=entry['author_id'],
+            parent_id=entry.get('parent_id'),
+            text=entry['text'],
+            created_at=parse_datetime(entry['created_at']),
+            updated_at=now,
+        )
+        for entry in entries
+    }
+    with transaction.atomic():
+        posts = set(Post.objects.filter(
+            pk__in={comment.post_id for comment in comments.values()}
+        ).values_list('pk', flat=True))
+        authors = set(User.objects.filter(
+            pk__in={comment.author_id for comment in comments.values()}
+        ).values_list('pk', flat=True))
+        parents = dict(Comment.objects.filter(pk__in={
+            comment.parent_id for comment in comments.values()
+            if comment.parent_id
+        }).values_list('pk', 'post_id'))
+        inserted = set(Comment.objects.filter(created_at__in=[
+            comment.created_at for comment in comments.values()
+        ]).values_list('post_id', 'author_id', 'created_at'))
+        batch, discarded = [], 0
+        for entry_id, comment in comments.items():
+            if comment.post_id not in posts:
+                reason = f'пост {comment.post_id} удалён'
+            elif comment.author_id not in authors:
+                reason = f'автор {comment.author_id} удалён'
+            elif (comment.parent_id in parents
+                  and parents[comment.parent_id] != comment.post_id):
+                reason = f'комментарий {comment.parent_id} из другого поста'
+            elif (comment.post_id, comment.author_id,
+                  comment.created_at) in inserted:
+                continue
+            else:
+                if comment.parent_id not in parents:
+                    comment.parent_id = None
+                batch.append(comment)
+                continue
+            logger.warning('Комментарий %s из очереди отброшен: %s',
+                           entry_id, reason)
+            discarded += 1
+        bulk_create_with_timestamps(Comment, batch)
+        pks = [comment.pk for comment in batch]
+        # bulk_create не вызывает save() и сигналы: путь в ветке
+        # и статистика авторов обновляются здесь.
+        Comment.objects.filter(pk__in=pks).refresh_paths()
+        deltas = {}
+        for comment in batch:
+            AuthorStats.add(deltas, comment.author_id, comment_count=1)
+        AuthorStats.apply(deltas)
+        Change.record(Comment, pks, Change.SAVED)
+    if discarded:
+        metrics.record('comment_queue', 'discarded', comments=discarded)
+    return len(batch)
+
+
+def flush(batch_size=BATCH_SIZE):
+    """Записывает в БД всё, что накопилось в очереди; возвращает число.
+
+    Параллельные воркеры ждут друг друга, чтобы не записать один файл
+    дважды.
+    """
+    written = 0
+    with locked(name=WORKER_LOCK_FILE):
+        for path in claim():
+            entries = read_entries(path)
+            for start in range(0, len(entries), batch_size):
+                written += insert_batch(entries[start:start + batch_size])
+            forget(entries)
+            os.remove(path)
+    if written:
+        metrics.record('comment_queue', 'flush', comments=written)
+    return written
@@ -0,0 +1,169 @@
+"""Потоковый экспорт и импорт данных блога в формате JSON Lines.
+
+Каждая строка файла — одна запись: {"model": ..., "fields": {...}}.
+Модели выгружаются в порядке зависимостей. Пользователи и категории
+связываются по естественным ключам (username и slug), местоположения,
+посты и комментарии сохраняют свои первичные ключи.
+"""
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from .models import AuthorStats, Category, Change, Comment, Location, Post
+from .tracking import TRACKED_MODELS, bulk_create_with_timestamps
+
+User = get_user_model()
+
+# Поле в файле -> путь для values() при выгрузке.
+EXPORT_FIELDS = {
+    User: {
+        name: name for name in (
+            'username', 'password', 'first_name', 'last_name', 'email',
+            'is_staff', 'is_active', 'is_superuser', 'date_joined',
+            'last_login',
+        )
+    },
+    Category: {
+        name: name for name in (
+            'slug', 'title', 'description', 'is_published', 'created_at',
+            'updated_at',
+        )
+    },
+    Location: {
+        name: name for name in (
+            'pk', 'name', 'is_published', 'created_at', 'updated_at',
+        )
+    },
+    Post: {
+        **{name: name for name in (
+            'pk', 'title', 'text', 'pub_date', 'image', 'location_id',
+            'is_published', 'created_at', 'updated_at',
+        )},
+        'author': 'author__username',
+        'category': 'category__slug',
+    },
+    Comment: {
+        **{name: name for name in (
+            'pk', 'post_id', 'parent_id', 'text', 'created_at',
+            'updated_at',
+        )},
+        'author': 'author__username',
+    },
+}
+MODELS = {model._meta.label_lower: model for model in EXPORT_FIELDS}
+
+# Модели, которые связываются не по pk, а по уникальному полю.
+UNIQUE_KEYS = {User: 'username', Category: 'slug'}
+
+# Поле в файле -> модель, на которую оно ссылается естественным ключом.
+NATURAL_KEYS = {'author': User, 'category': Category}
+
+
+def export_lines(model, chunk_size):
+    """Строки JSON Lines модели, читаемые из БД порциями."""
+    fields = EXPORT_FIELDS[model]
+    label = model._meta.label_lower
+    rows = model.objects.order_by('pk').values(*fields.values())
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield json.dumps(
+            {
+                'model': label,
+                'fields': {name: row[path] for name, path in fields.items()},
+            },
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        )
+
+
+class MissingReferences(Exception):
+    """Записи порции ссылаются на отсутствующие объекты."""
+
+    def __init__(self, model, missing):
+        self.model = model
+        self.missing = missing
+        details = '; '.join(
+            f'{name}: {", ".join(map(repr, sorted(values)[:5]))}'
+            for name, values in missing.items()
+        )
+        super().__init__(
+            f'{model._meta.label_lower}: не найдены {details}'
+        )
+
+
+def resolve_natural_keys(model, records):
+    """Заменяет естественные ключи на id одним запросом на модель.
+
+    Возвращает записи, у которых нашлись все обязательные ссылки, и
+    ненайденные значения: {поле: множество значений}.
+    """
+    missing = {}
+    for name, key_model in NATURAL_KEYS.items():
+        if name not in EXPORT_FIELDS[model]:
+            continue
+        key = UNIQUE_KEYS[key_model]
+        ids = dict(key_model.objects.filter(**{
+            f'{key}__in': {record[name] for record in records}
+        }).values_list(key, 'pk'))
+        nullable = model._meta.get_field(name).null
+        resolved = []
+        for record in records:
+            value = record.pop(name)
+            if value in ids or (value is None and nullable):
+                record[f'{name}_id'] = ids.get(value)
+                resolved.append(record)
+            else:
+                missing.setdefault(name, set()).add(value)
+        records = resolved
+    return records, missing
+
+
+def import_batch(model, records, skip_missing=False):
+    """Вставляет порцию записей одной модели одним bulk_create.
+
+    Уже существующие записи пропускаются, поэтому повторный импорт той же
+    порции безопасен. Если естественные ключи не нашлись, порция не
+    вставляется и поднимается MissingReferences; с skip_missing такие
+    записи пропускаются. Возвращает пару (вставлено, пропущено).
+    """
+    total = len(records)
+    records, missing = resolve_natural_keys(model, records)
+    if missing and not skip_missing:
+        raise MissingReferences(model, missing)
+    objs = [model(**record) for record in records]
+    if model is Post:
+        for obj in objs:
+            obj.excerpt = Post.make_excerpt(obj.text)
+    with transaction.atomic():
+        bulk_create_with_timestamps(
+            model, objs, key=UNIQUE_KEYS.get(model, 'pk'),
+            ignore_conflicts=True
+        )
+        if model in TRACKED_MODELS:
+            pks = [obj.pk for obj in objs if obj.pk is not None]
+            if model is Post:
+                # bulk_create не вызывает save(), где считается видимость.
+                Post.objects.filter(pk__in=pks).refresh_visibility()
+            elif model is Comment:
+                # И путь в ветке: родители выгружены раньше ответов.
+                Comment.objects.filter(pk__in=pks).refresh_paths()
+            if model in (Post, Comment):
+                # Пропущенные дубликаты неотличимы от новых записей,
+                # поэтому статистика авторов порции пересчитывается.
+                AuthorStats.refresh(model.objects.filter(
+                    pk__in=pks
+                ).values_list('author_id', flat=True))
+            Change.record(model, pks, Change.SAVED)
+    return len(objs), total - len(objs)
+
+
+def reset_sequences():
+    """Сдвигает автоинкременты за импортированные первичные ключи."""
+    statements = connection.ops.sequence_reset_sql(
+        no_style(), list(EXPORT_FIELDS)
+    )
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
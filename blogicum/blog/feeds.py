@@ -0,0 +1,140 @@
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import quote_etag
+
+from core.cache import versioned_key
+
+from .models import Category, User
+from .registry import registry
+from .views import process_posts
+
+FEED_SIZE = 20
+# Выход отложенных постов сбрасывает кэш через планировщик
+# (publish_scheduled), поэтому ленты можно хранить долго.
+FEED_CACHE_TIMEOUT = 24 * 60 * 60
+FEED_CACHE_NAMESPACE = 'feeds'
+
+
+def cached_feed(feed):
+    """Кэширует ленту до изменения постов и отвечает на условный GET."""
+    def view(request, *args, **kwargs):
+        # Ленты не читают параметры запроса: ключ без них не даёт
+        # забить кэш копиями одной ленты с разными ?utm=.
+        key = versioned_key(FEED_CACHE_NAMESPACE, request.path)
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, *args, **kwargs)
+            cached = (
+                response.content,
+                response['Content-Type'],
+                quote_etag(hashlib.md5(response.content).hexdigest()),
+            )
+            cache.set(key, cached, FEED_CACHE_TIMEOUT)
+        content, content_type, etag = cached
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        return response
+    return view
+
+
+class PostsFeed(Feed):
+    """Новые публикации всего блога."""
+
+    title = 'Блогикум: новые публикации'
+    link = reverse_lazy('blog:index')
+    description = 'Последние публикации всех авторов Блогикума.'
+
+    def items(self):
+        return registry.attach(list(process_posts(
+            apply_annotation=False, profile='feed'
+        )[:FEED_SIZE]))
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return (item.category.title,)
+
+
+class CategoryFeed(PostsFeed):
+    """Новые публикации категории."""
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=[category.slug])
+
+    def description(self, category):
+        return category.description
+
+    def items(self, category):
+        return registry.attach(list(process_posts(
+            category.posts.all(), apply_annotation=False, profile='feed'
+        )[:FEED_SIZE]))
+
+
+class AuthorFeed(PostsFeed):
+    """Новые публикации автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Блогикум: публикации @{author.username}'
+
+    def link(self, author):
+        return reverse('blog:profile', args=[author.username])
+
+    def description(self, author):
+        return f'Последние публикации пользователя @{author.username}.'
+
+    def items(self, author):
+        return registry.attach(list(process_posts(
+            author.posts.all(), apply_annotation=False, profile='feed'
+        )[:FEED_SIZE]))
+
+
+class PostsAtomFeed(PostsFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, category):
+        return self.description(category)
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
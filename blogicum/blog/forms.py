@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserChangeForm
 
-from .models import Comment, Post, User
+from .models import Category, Comment, Post, User
 
 
 class ProfileEditForm(UserChangeForm):
@@ -32,3 +32,12 @@ class PostForm(forms.ModelForm):
                 format='%Y-%m-%d'
             )
         }
+
+
+class MoveCategoryForm(forms.Form):
+    """Выбор категории для массового переноса постов."""
+
+    category = forms.ModelChoiceField(
+        Category.objects.all(),
+        label='Новая категория'
+    )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет анонсы постов, у которых их ещё нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать анонсы всех постов, например после смены '
+                 'длины анонса.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов обновлять одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.all()
+        if not options['all']:
+            posts = posts.filter(excerpt='')
+        total = posts.refresh_excerpts(batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f'Анонсы обновлены для {total} постов')
+        )
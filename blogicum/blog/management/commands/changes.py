@@ -0,0 +1,44 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Change
+
+
+class Command(BaseCommand):
+    help = 'Выводит журнал изменений после заданного номера в JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', type=int, default=0,
+            help='Номер последнего уже обработанного изменения.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько изменений читать за один запрос.'
+        )
+        parser.add_argument(
+            '--follow', action='store_true',
+            help='Не завершаться, а ждать новых изменений.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза между опросами в режиме --follow, секунды.'
+        )
+
+    def handle(self, *args, since, batch_size, follow, interval, **options):
+        while True:
+            batch = list(
+                Change.objects.filter(seq__gt=since)[:batch_size]
+            )
+            for change in batch:
+                self.stdout.write(
+                    json.dumps(change.as_dict(), ensure_ascii=False)
+                )
+            if batch:
+                since = batch[-1].seq
+            if len(batch) < batch_size:
+                if not follow:
+                    break
+                time.sleep(interval)
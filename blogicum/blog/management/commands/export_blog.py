@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from blog.exchange import EXPORT_FIELDS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает пользователей и данные блога в JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл для выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Сколько строк читать из БД за один запрос.'
+        )
+
+    def handle(self, *args, path, chunk_size, **options):
+        output = (
+            sys.stdout if path == '-'
+            else open(path, 'w', encoding='utf-8')
+        )
+        try:
+            for model in EXPORT_FIELDS:
+                count = 0
+                for line in export_lines(model, chunk_size):
+                    output.write(line + '\n')
+                    count += 1
+                    if not count % chunk_size:
+                        self.stderr.write(
+                            f'{model._meta.label_lower}: {count}'
+                        )
+                self.stderr.write(
+                    f'{model._meta.label_lower}: {count}, готово'
+                )
+        finally:
+            if output is not sys.stdout:
+                output.close()
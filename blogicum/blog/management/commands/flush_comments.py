@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog import comment_queue
+
+
+class Command(BaseCommand):
+    help = 'Записывает в БД комментарии из очереди отложенной записи.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, забирая очередь каждые --interval.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1,
+            help='Пауза между проверками очереди в секундах.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=comment_queue.BATCH_SIZE,
+            help='Сколько комментариев вставлять одной транзакцией.'
+        )
+
+    def handle(self, *args, loop, interval, batch_size, **options):
+        while True:
+            close_old_connections()
+            written = comment_queue.flush(batch_size)
+            if written:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Записано комментариев: {written}')
+                )
+            if not loop:
+                return
+            time.sleep(interval)
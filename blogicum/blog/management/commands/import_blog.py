@@ -0,0 +1,97 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.exchange import (
+    MODELS,
+    MissingReferences,
+    import_batch,
+    reset_sequences,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает файл JSON Lines из export_blog порциями '
+        'bulk_create. Прерванный импорт продолжается с ключом --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл, созданный export_blog.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько записей вставлять одной транзакцией.'
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Пропустить строки, загруженные прошлым запуском.'
+        )
+        parser.add_argument(
+            '--skip-missing', action='store_true',
+            help='Пропускать записи со ссылками на отсутствующих '
+                 'пользователей и категории вместо остановки импорта.'
+        )
+
+    def read_batches(self, path, done, batch_size):
+        """Порции записей одной модели и номер последней строки порции."""
+        model, batch, last_line = None, [], done
+        with open(path, encoding='utf-8') as source:
+            for line_no, line in enumerate(source, start=1):
+                if line_no <= done or not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    record_model = MODELS[record['model']]
+                except (ValueError, KeyError) as error:
+                    raise CommandError(f'Строка {line_no}: {error!r}')
+                if batch and (
+                    record_model is not model or len(batch) >= batch_size
+                ):
+                    yield model, batch, last_line
+                    batch = []
+                model, last_line = record_model, line_no
+                batch.append(record['fields'])
+        if batch:
+            yield model, batch, last_line
+
+    def handle(self, *args, path, batch_size, resume, skip_missing,
+               **options):
+        # Номер последней загруженной строки хранится рядом с файлом
+        # и обновляется после каждой зафиксированной порции.
+        state = Path(f'{path}.progress')
+        done = int(state.read_text()) if resume and state.exists() else 0
+        started = time.monotonic()
+        imported, skipped = 0, {}
+        for model, batch, last_line in self.read_batches(
+            path, done, batch_size
+        ):
+            try:
+                inserted, missed = import_batch(model, batch, skip_missing)
+            except MissingReferences as error:
+                raise CommandError(
+                    f'{error}. Порция до строки {last_line} не загружена; '
+                    'добавьте недостающие объекты и продолжите с --resume '
+                    'или запустите с --skip-missing.'
+                )
+            imported += inserted
+            if missed:
+                label = model._meta.label_lower
+                skipped[label] = skipped.get(label, 0) + missed
+            state.write_text(str(last_line))
+            rate = imported / max(time.monotonic() - started, 1e-6)
+            self.stderr.write(
+                f'{model._meta.label_lower}: строка {last_line}, '
+                f'обработано {imported} ({rate:.0f} записей/с)'
+            )
+        reset_sequences()
+        state.unlink(missing_ok=True)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано записей: {imported}')
+        )
+        for label, count in skipped.items():
+            self.stdout.write(self.style.WARNING(
+                f'{label}: пропущено записей со ссылками на отсутствующие '
+                f'объекты: {count}'
+            ))
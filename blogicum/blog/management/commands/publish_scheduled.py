@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Публикует отложенные посты, время которых наступило.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, просыпаясь к ближайшей публикации.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Наибольшая пауза между проверками в секундах.'
+        )
+
+    def handle(self, *args, loop, interval, **options):
+        while True:
+            close_old_connections()
+            now = timezone.now()
+            published = Post.objects.publish_due(now)
+            if published:
+                self.stdout.write(
+                    self.style.SUCCESS(f'Опубликовано постов: {published}')
+                )
+            if not loop:
+                return
+            next_due = Post.objects.next_due(now)
+            pause = interval
+            if next_due is not None:
+                pause = min(pause, (next_due - now).total_seconds())
+            time.sleep(max(pause, 0))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import AuthorStats, User
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику всех авторов порциями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько авторов пересчитывать одним UPDATE.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        batch, total = [], 0
+        for pk in User.objects.values_list('pk', flat=True).iterator():
+            batch.append(pk)
+            if len(batch) >= batch_size:
+                AuthorStats.refresh(batch)
+                total, batch = total + len(batch), []
+        AuthorStats.refresh(batch)
+        total += len(batch)
+        self.stdout.write(
+            self.style.SUCCESS(f'Статистика пересчитана для {total} авторов')
+        )
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:51
+
+import blog.models
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    for name in ('Category', 'Comment', 'Location', 'Post'):
+        apps.get_model('blog', name).objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_alter_comment_author'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'default_related_name': 'comments', 'ordering': ('created_at',), 'verbose_name': 'комментарий', 'verbose_name_plural': 'Комментарии'},
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=blog.models.UpdatedAtField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=blog.models.UpdatedAtField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='updated_at',
+            field=blog.models.UpdatedAtField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=blog.models.UpdatedAtField(auto_now=True, db_index=True, verbose_name='Изменено'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='blog.post', verbose_name='Пост'),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_alter_comment_options_category_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False, verbose_name='Номер')),
+                ('model', models.CharField(max_length=64, verbose_name='Модель')),
+                ('object_id', models.BigIntegerField(verbose_name='Идентификатор объекта')),
+                ('action', models.CharField(choices=[('save', 'Сохранение'), ('delete', 'Удаление')], max_length=8, verbose_name='Действие')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+            ],
+            options={
+                'verbose_name': 'изменение',
+                'verbose_name_plural': 'Журнал изменений',
+                'ordering': ('seq',),
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_change'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата и время создания'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.1 on 2026-10-19 07:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def build_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+    users = User.objects.annotate(
+        post_count=Count('posts', distinct=True),
+        published_count=Count(
+            'posts', filter=Q(posts__is_published=True), distinct=True
+        ),
+        comment_count=Count('comments', distinct=True),
+        last_post_date=Max('posts__pub_date'),
+    ).values(
+        'pk', 'post_count', 'published_count', 'comment_count',
+        'last_post_date'
+    )
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(author_id=user.pop('pk'), **user)
+            for user in users.iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0013_alter_comment_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('published_count', models.PositiveIntegerField(default=0, verbose_name='Опубликовано')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_post_date', models.DateTimeField(blank=True, null=True, verbose_name='Последняя публикация')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(build_stats, migrations.RunPython.noop),
+    ]
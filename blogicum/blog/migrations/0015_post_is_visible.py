@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:03
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_is_visible(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        is_published=True, pub_date__lte=timezone.now()
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_authorstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Пересчитывается при сохранении и планировщиком отложенных публикаций.', verbose_name='Виден в ленте'),
+        ),
+        migrations.RunPython(fill_is_visible, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_visible', '-pub_date'], name='post_visible_pub_date_idx'),
+        ),
+    ]
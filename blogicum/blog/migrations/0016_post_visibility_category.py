@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:04
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def hide_unpublished_categories(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(
+        Q(category__isnull=True) | Q(category__is_published=False),
+        is_visible=True
+    ).update(is_visible=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Пост и его категория опубликованы, время публикации наступило.', verbose_name='Виден в ленте'),
+        ),
+        migrations.RunPython(
+            hide_unpublished_categories, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:05
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# Как в Post.make_excerpt на момент миграции.
+EXCERPT_WORDS = 10
+BATCH_SIZE = 500
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('pk', 'text').iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        post.excerpt = Truncator(post.text).words(
+            EXCERPT_WORDS, truncate=' …'
+        )
+        batch.append(post)
+        if len(batch) >= BATCH_SIZE:
+            Post.objects.bulk_update(batch, ('excerpt',))
+            batch = []
+    Post.objects.bulk_update(batch, ('excerpt',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_visibility_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Начало текста для карточки поста в ленте.', verbose_name='Анонс'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
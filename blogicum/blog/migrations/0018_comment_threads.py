@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, LPad
+
+
+def fill_paths(apps, schema_editor):
+    # Все существующие комментарии — корни веток.
+    Comment = apps.get_model('blog', 'Comment')
+    Comment.objects.update(
+        path=LPad(Cast('pk', CharField()), 10, Value('0'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_post_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='blog.comment', verbose_name='Ответ на'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, help_text='Номера комментариев от корня ветки; порядок вывода.', max_length=255, verbose_name='Путь в ветке'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:30
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_visible_posts(apps, schema_editor):
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+    Post = apps.get_model('blog', 'Post')
+    visible = Post.objects.filter(
+        is_visible=True, author=OuterRef('author_id')
+    ).order_by().values('author')
+    AuthorStats.objects.update(
+        published_count=Coalesce(Subquery(
+            visible.annotate(value=Count('pk')).values('value')
+        ), 0),
+        last_post_date=Subquery(
+            visible.annotate(value=Max('pub_date')).values('value')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0018_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='authorstats',
+            name='published_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Видно в ленте'),
+        ),
+        migrations.RunPython(count_visible_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_authorstats_visible_posts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='replies', to='blog.comment', verbose_name='Ответ на'),
+        ),
+    ]
@@ -1,10 +1,25 @@
+import hashlib
+import uuid
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import redirect
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
+from django.utils.safestring import mark_safe
+
+from core import ratelimit
 
 from .forms import CommentForm
 from .models import Comment, Post
+from .registry import registry
 
 
 class BasePostMixin:
@@ -42,6 +57,28 @@ class CommentBaseMixin(LoginRequiredMixin):
         return reverse('blog:post_detail', args=[self.kwargs['post_id']])
 
 
+class RateLimitMixin:
+    """Ограничение частоты записей через core.ratelimit.
+
+    Лимиты берутся из RATE_LIMITS по имени view из urls. Проверка идёт
+    до формы и запросов на запись, поэтому поток отклонённых запросов не
+    занимает БД; GET-запросы к форме не ограничиваются.
+    """
+
+    rate_limit_methods = ('POST',)
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in self.rate_limit_methods:
+            retry_after = ratelimit.check(
+                request, request.resolver_match.view_name
+            )
+            if retry_after:
+                return ratelimit.too_many_requests(
+                    'Слишком много запросов, попробуйте позже.', retry_after
+                )
+        return super().dispatch(request, *args, **kwargs)
+
+
 class CommentObjectMixin:
     """Миксин для получения конкретного комментария."""
 
@@ -49,3 +86,95 @@ class CommentObjectMixin:
     pk_url_kwarg = 'comment_id'
     template_name = 'blog/comment.html'
     success_url = reverse_lazy('blog:index')
+
+
+class ConditionalGetMixin:
+    """Ответ 304 Not Modified по ETag.
+
+    Наследник определяет get_validators(), который одним запросом
+    возвращает состояние страницы или None, если объект не найден.
+    Last-Modified не отдаётся: удаления не двигают время последнего
+    изменения вперёд, и ответ только по If-Modified-Since был бы
+    устаревшим.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get_etag(self, state):
+        # Страница зависит от пользователя и CSRF-токена в формах,
+        # поэтому в ETag попадают их cookie; запросов к БД это не требует.
+        cookies = self.request.COOKIES
+        token = '|'.join(str(part) for part in (
+            cookies.get(settings.SESSION_COOKIE_NAME, ''),
+            cookies.get(settings.CSRF_COOKIE_NAME, ''),
+            *state
+        ))
+        return quote_etag(hashlib.md5(token.encode()).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        state = self.get_validators()
+        if state is None:
+            return super().dispatch(request, *args, **kwargs)
+        etag = self.get_etag(state)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers.setdefault('ETag', etag)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class RegistryRelatedMixin:
+    """Категории и местоположения постов страницы — из реестра, без JOIN."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        registry.attach(context['object_list'])
+        return context
+
+
+class StreamingFeedMixin(RegistryRelatedMixin):
+    """Потоковая отдача ленты: сначала страница до списка постов, затем
+    карточки по мере чтения постов из БД, затем остаток страницы.
+
+    Включается настройкой STREAMING_FEEDS; шаблон выводит карточки через
+    includes/post_feed.html.
+    """
+
+    stream_chunk_size = 5
+    article_template = 'includes/post_article.html'
+
+    def get_context_data(self, **kwargs):
+        if not settings.STREAMING_FEEDS:
+            return super().get_context_data(**kwargs)
+        # Посты страницы читаются только при отдаче, см. stream().
+        return super(RegistryRelatedMixin, self).get_context_data(**kwargs)
+
+    def render_to_response(self, context, **response_kwargs):
+        if not settings.STREAMING_FEEDS:
+            return super().render_to_response(context, **response_kwargs)
+        marker = f'<!-- posts:{uuid.uuid4().hex} -->'
+        page = render_to_string(
+            self.get_template_names(),
+            {**context, 'post_stream_marker': mark_safe(marker)},
+            request=self.request
+        )
+        head, tail = page.split(marker, 1)
+        return StreamingHttpResponse(
+            self.stream(head, context['page_obj'].object_list, tail),
+            content_type='text/html; charset=utf-8',
+            **response_kwargs
+        )
+
+    def stream(self, head, posts, tail):
+        yield head
+        template = get_template(self.article_template)
+        for post in posts.iterator(chunk_size=self.stream_chunk_size):
+            registry.attach([post])
+            yield template.render({'post': post})
+        yield tail
@@ -1,9 +1,65 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.dispatch import Signal
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from .bulk import run_in_batches
 
 User = get_user_model()
 
+# Сколько слов текста попадает в анонс поста.
+EXCERPT_WORDS = 10
+
+# Отправляется после записи изменений в журнал: sender — модель,
+# pks — первичные ключи изменённых объектов, action — Change.SAVED
+# или Change.DELETED. Ловит и сохранения, и массовые update().
+changes_recorded = Signal()
+
+
+class UpdatedAtField(models.DateTimeField):
+    """Индексированная дата последнего изменения записи."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('verbose_name', 'Изменено')
+        kwargs.setdefault('auto_now', True)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+
+class TrackedQuerySet(models.QuerySet):
+    """QuerySet, обновляющий updated_at и при массовом update()."""
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', timezone.now())
+        # Обновляются ровно те строки, что попадут в журнал: фильтр не
+        # выполняется повторно, а строки не меняются между шагами.
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            rows = self.model._base_manager.using(self.db).filter(
+                pk__in=pks
+            ).update(**kwargs)
+            self.after_update(pks, kwargs)
+            Change.record(self.model, pks, Change.SAVED)
+        return rows
+
+    def after_update(self, pks, fields):
+        """Обновляет производные поля до записи изменений в журнал."""
+
 
 class BasePublicationModel(models.Model):
     """Базовая модель для публикаций."""
@@ -18,6 +74,9 @@ class BasePublicationModel(models.Model):
         db_index=True,
         verbose_name='Добавлено'
     )
+    updated_at = UpdatedAtField()
+
+    objects = TrackedQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -43,6 +102,29 @@ class Location(BasePublicationModel):
         return f'{self.name[:50]} ({super().__str__()})'
 
 
+class CategoryQuerySet(TrackedQuerySet):
+    """QuerySet категорий, переносящий публикацию на видимость постов."""
+
+    def after_update(self, pks, fields):
+        if 'is_published' in fields:
+            self.model.objects.filter(pk__in=pks).refresh_post_visibility()
+
+    def refresh_post_visibility(self):
+        """Пересчитывает is_visible постов категорий порциями.
+
+        Посты, чья видимость изменилась, попадают в журнал, как и при
+        выходе отложенных публикаций.
+        """
+        pks = list(
+            Post.objects.filter(category__in=self).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        return run_in_batches(
+            pks,
+            lambda batch: Post.objects.filter(pk__in=batch).sync_visibility()
+        )
+
+
 class Category(BasePublicationModel):
     """Модель категории для публикаций."""
 
@@ -58,15 +140,148 @@ class Category(BasePublicationModel):
                   'разрешены символы латиницы, цифры, дефис и подчёркивание.'
     )
 
+    objects = CategoryQuerySet.as_manager()
+
+    # Значение is_published на момент загрузки из БД.
+    _published_in_db = None
+
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
         ordering = ('title',)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._published_in_db = instance.__dict__.get('is_published')
+        return instance
+
+    def save(self, *args, **kwargs):
+        toggled = (
+            self._published_in_db is not None
+            and self._published_in_db != self.is_published
+        )
+        super().save(*args, **kwargs)
+        self._published_in_db = self.is_published
+        if toggled:
+            Category.objects.filter(pk=self.pk).refresh_post_visibility()
+
     def __str__(self):
         return f'{self.title[:50]} ({super().__str__()})'
 
 
+class PostQuerySet(TrackedQuerySet):
+    """QuerySet постов, поддерживающий флаг видимости is_visible."""
+
+    # Поля, от которых зависит видимость поста.
+    VISIBILITY_FIELDS = frozenset(
+        ('is_published', 'pub_date', 'category', 'category_id')
+    )
+    # Поля, от которых зависит вклад поста в статистику автора.
+    STATS_FIELDS = VISIBILITY_FIELDS | {'is_visible', 'author', 'author_id'}
+
+    # Наборы полей, которые загружают разные страницы. Категория
+    # и местоположение подставляются из реестра, у автора нужно только имя.
+    CARD_FIELDS = (
+        'title', 'excerpt', 'pub_date', 'image', 'is_published', 'category',
+        'location', 'author__username',
+    )
+    FIELD_PROFILES = {
+        'card': CARD_FIELDS,
+        'feed': (*CARD_FIELDS, 'updated_at'),
+        'detail': (*CARD_FIELDS, 'text'),
+    }
+
+    def update(self, **kwargs):
+        if not self.STATS_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+        # Статистика авторов меняется на разницу состояний постов.
+        with transaction.atomic(using=self.db):
+            before = self.stats_states()
+            rows = super().update(**kwargs)
+            after = Post.objects.filter(pk__in=before).stats_states()
+            AuthorStats.apply(AuthorStats.add_post_changes({}, before, after))
+        return rows
+
+    def stats_states(self):
+        """Вклады постов в статистику авторов: {pk: Post.stats_state()}."""
+        return {
+            pk: tuple(state) for pk, *state in self.order_by().values_list(
+                'pk', *AuthorStats.POST_FIELDS
+            )
+        }
+
+    def after_update(self, pks, fields):
+        posts = self.model.objects.filter(pk__in=pks)
+        if self.VISIBILITY_FIELDS.intersection(fields):
+            posts.refresh_visibility()
+        if 'text' in fields:
+            posts.refresh_excerpts()
+
+    def refresh_excerpts(self, batch_size=500):
+        """Пересчитывает анонсы порциями без записи в журнал.
+
+        Возвращает число обработанных постов.
+        """
+        # Обычный QuerySet: bulk_update не должен менять updated_at.
+        plain = models.QuerySet(self.model)
+        batch, total = [], 0
+        for post in self.only('pk', 'text').iterator(chunk_size=batch_size):
+            post.excerpt = Post.make_excerpt(post.text)
+            batch.append(post)
+            if len(batch) >= batch_size:
+                plain.bulk_update(batch, ('excerpt',))
+                total, batch = total + len(batch), []
+        plain.bulk_update(batch, ('excerpt',))
+        return total + len(batch)
+
+    def with_profile(self, name):
+        """Загружает только поля профиля name из FIELD_PROFILES."""
+        return self.only(*self.FIELD_PROFILES[name])
+
+    def refresh_visibility(self, now=None):
+        """Пересчитывает is_visible одним UPDATE без записи в журнал.
+
+        Только для постов, которые и так попадают в журнал в той же
+        транзакции; иначе — sync_visibility().
+        """
+        is_visible = ExpressionWrapper(
+            Post.visibility_condition(now), output_field=models.BooleanField()
+        )
+        return super(TrackedQuerySet, self).update(is_visible=is_visible)
+
+    def sync_visibility(self, now=None):
+        """Переключает is_visible постов, чья видимость изменилась.
+
+        Обычный update() записывает переключённые посты в журнал и
+        обновляет их updated_at; остальные посты не трогаются.
+        """
+        condition = Post.visibility_condition(now)
+        shown = self.filter(is_visible=False).filter(condition).update(
+            is_visible=True
+        )
+        hidden = self.filter(is_visible=True).exclude(condition).update(
+            is_visible=False
+        )
+        return shown + hidden
+
+    def publish_due(self, now=None):
+        """Показывает посты, время публикации которых наступило.
+
+        Обычный update() записывает изменения в журнал, а значит, сбрасывает
+        кэши лент ровно в момент выхода отложенных постов.
+        """
+        return self.filter(is_visible=False).filter(
+            Post.visibility_condition(now)
+        ).update(is_visible=True)
+
+    def next_due(self, now=None):
+        """Время ближайшей отложенной публикации или None."""
+        return self.filter(
+            is_published=True, pub_date__gt=now or timezone.now()
+        ).aggregate(next_due=Min('pub_date'))['next_due']
+
+
 class Post(BasePublicationModel):
     """Модель публикации."""
 
@@ -102,12 +317,81 @@ class Post(BasePublicationModel):
         verbose_name='Фото',
         blank=True
     )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Анонс',
+        help_text='Начало текста для карточки поста в ленте.'
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден в ленте',
+        help_text='Пост и его категория опубликованы, время публикации '
+                  'наступило.'
+    )
+
+    objects = PostQuerySet.as_manager()
+
+    # Вклад поста в статистику автора на момент загрузки из БД.
+    _stats_in_db = None
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('is_visible', '-pub_date'),
+                name='post_visible_pub_date_idx'
+            ),
+        )
+
+    @staticmethod
+    def visibility_condition(now=None):
+        """Условие, при котором пост виден читателям."""
+        return Q(
+            Exists(Category.objects.filter(
+                pk=OuterRef('category_id'), is_published=True
+            )),
+            is_published=True,
+            pub_date__lte=now or timezone.now(),
+        )
+
+    @staticmethod
+    def make_excerpt(text):
+        return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stats_in_db = instance.stats_state()
+        return instance
+
+    def stats_state(self):
+        """Загруженные поля AuthorStats.POST_FIELDS; None — не загружено."""
+        return tuple(
+            self.__dict__.get(name) for name in AuthorStats.POST_FIELDS
+        )
+
+    def save(self, *args, **kwargs):
+        derived = ['is_visible']
+        # Без загруженного текста анонс не мог измениться.
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = self.make_excerpt(self.text)
+            derived.append('excerpt')
+        self.is_visible = (
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category is not None
+            and self.category.is_published
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *derived}
+        super().save(*args, **kwargs)
+        self._stats_in_db = self.stats_state()
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', args=[self.pk])
@@ -116,9 +400,40 @@ class Post(BasePublicationModel):
         return f'{self.title[:50]} ({super().__str__()})'
 
 
+class CommentQuerySet(TrackedQuerySet):
+    """QuerySet комментариев с материализованным путём в ветке."""
+
+    def refresh_paths(self):
+        """Пересчитывает path комментариев без записи в журнал.
+
+        Родитель создаётся раньше ответа и имеет меньший pk, поэтому при
+        обходе по pk его путь уже известен.
+        """
+        comments = list(self.order_by('pk').only('pk', 'parent_id'))
+        paths = dict(Comment.objects.filter(pk__in={
+            comment.parent_id for comment in comments if comment.parent_id
+        }).values_list('pk', 'path'))
+        for comment in comments:
+            comment.path = Comment.make_path(
+                paths.get(comment.parent_id, ''), comment.pk
+            )
+            paths[comment.pk] = comment.path
+        # Обычный QuerySet: bulk_update не должен менять updated_at.
+        models.QuerySet(Comment).bulk_update(
+            comments, ('path',), batch_size=500
+        )
+        return len(comments)
+
+
 class Comment(models.Model):
     """Модель комментария."""
 
+    # Ширина номера комментария в пути и предел вложенности: ответы
+    # глубже MAX_DEPTH показываются рядом со своим родителем.
+    PATH_STEP = 10
+    PATH_SEPARATOR = '.'
+    MAX_DEPTH = 20
+
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -129,19 +444,306 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         verbose_name='Автор',
     )
+    # Ответы переживают удаление родителя: их путь по-прежнему ставит
+    # их на место удалённого комментария.
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='replies',
+        verbose_name='Ответ на',
+    )
+    path = models.CharField(
+        'Путь в ветке',
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text='Номера комментариев от корня ветки; порядок вывода.',
+    )
     text = models.TextField('Текст')
     created_at = models.DateTimeField(
         'Дата и время создания',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
+    updated_at = UpdatedAtField()
+
+    objects = CommentQuerySet.as_manager()
+
+    # Автор на момент загрузки из БД.
+    _author_in_db = None
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
         default_related_name = 'comments'
+        indexes = [
+            # Вся ветка поста или поддерево — один диапазон индекса.
+            models.Index(
+                fields=('post', 'path'), name='comment_post_path_idx'
+            ),
+        ]
+
+    @classmethod
+    def make_path(cls, parent_path, pk):
+        """Путь комментария pk, отвечающего на комментарий с parent_path."""
+        if parent_path.count(cls.PATH_SEPARATOR) + 1 >= cls.MAX_DEPTH:
+            parent_path = parent_path.rpartition(cls.PATH_SEPARATOR)[0]
+        step = str(pk).zfill(cls.PATH_STEP)
+        if not parent_path:
+            return step
+        return f'{parent_path}{cls.PATH_SEPARATOR}{step}'
+
+    @property
+    def depth(self):
+        return self.path.count(self.PATH_SEPARATOR)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._author_in_db = instance.__dict__.get('author_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            super().save(*args, **kwargs)
+            self._author_in_db = self.author_id
+            return
+        # Путь включает собственный pk, известный только после INSERT.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.path = self.make_path(
+                self.parent.path if self.parent_id else '', self.pk
+            )
+            models.QuerySet(Comment).filter(pk=self.pk).update(
+                path=self.path
+            )
+        self._author_in_db = self.author_id
 
     def __str__(self):
         comment_info = f'{self.author.username}: {self.text[:50]}...'
         creation_date = f'({self.created_at:%Y-%m-%d %H:%M})'
         return f'{comment_info} {creation_date}'
+
+
+class Change(models.Model):
+    """Запись журнала изменений для инкрементальной синхронизации."""
+
+    SAVED = 'save'
+    DELETED = 'delete'
+    ACTIONS = (
+        (SAVED, 'Сохранение'),
+        (DELETED, 'Удаление'),
+    )
+
+    seq = models.BigAutoField(primary_key=True, verbose_name='Номер')
+    model = models.CharField(max_length=64, verbose_name='Модель')
+    object_id = models.BigIntegerField(verbose_name='Идентификатор объекта')
+    action = models.CharField(
+        max_length=8,
+        choices=ACTIONS,
+        verbose_name='Действие'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+
+    class Meta:
+        verbose_name = 'изменение'
+        verbose_name_plural = 'Журнал изменений'
+        ordering = ('seq',)
+
+    @classmethod
+    def record(cls, model, pks, action):
+        """Записывает изменение объектов модели одним INSERT."""
+        cls.objects.bulk_create(
+            cls(model=model._meta.label_lower, object_id=pk, action=action)
+            for pk in pks
+        )
+        changes_recorded.send(sender=model, pks=pks, action=action)
+
+    def as_dict(self):
+        return {
+            'seq': self.seq,
+            'model': self.model,
+            'id': self.object_id,
+            'action': self.action,
+            'at': self.created_at.isoformat(),
+        }
+
+    def __str__(self):
+        return f'#{self.seq} {self.action} {self.model}:{self.object_id}'
+
+
+class AuthorStats(models.Model):
+    """Предрасчитанная статистика автора для страницы профиля."""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Публикаций'
+    )
+    published_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Видно в ленте'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Комментариев'
+    )
+    last_post_date = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Последняя публикация'
+    )
+
+    # Счётчики, которые меняются приращениями.
+    COUNTERS = ('post_count', 'published_count', 'comment_count')
+    # Поля поста, от которых зависит его вклад в статистику.
+    POST_FIELDS = ('author_id', 'is_visible', 'pub_date')
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    @staticmethod
+    def per_author(queryset, aggregate):
+        """Подзапрос агрегата по объектам автора строки статистики."""
+        return Subquery(
+            queryset.filter(author=OuterRef('author_id'))
+            .order_by().values('author').annotate(value=aggregate)
+            .values('value')
+        )
+
+    @classmethod
+    def refresh(cls, author_ids, create=True):
+        """Пересчитывает строки статистики только указанных авторов.
+
+        Всё считается одним UPDATE с подзапросами по индексу author_id.
+        Публичные published_count и last_post_date учитывают только
+        видимые посты, post_count — все, он показывается лишь автору.
+        create=False не создаёт недостающие строки: так безопасно звать
+        пересчёт при каскадном удалении самого автора.
+        """
+        author_ids = set(author_ids)
+        if not author_ids:
+            return
+        if create:
+            cls.objects.bulk_create(
+                (cls(author_id=pk) for pk in author_ids),
+                ignore_conflicts=True
+            )
+        per_author = cls.per_author
+        cls.objects.filter(author_id__in=author_ids).update(
+            post_count=Coalesce(
+                per_author(Post.objects.all(), Count('pk')), 0
+            ),
+            published_count=Coalesce(per_author(
+                Post.objects.filter(is_visible=True), Count('pk')
+            ), 0),
+            comment_count=Coalesce(
+                per_author(Comment.objects.all(), Count('pk')), 0
+            ),
+            last_post_date=per_author(
+                Post.objects.filter(is_visible=True), Max('pub_date')
+            ),
+        )
+
+    @staticmethod
+    def add(deltas, author_id, **delta):
+        """Копит приращения автора в deltas: {author_id: {поле: значение}}.
+
+        Кроме счётчиков: latest — дата появившегося видимого поста,
+        recount_latest — видимый пост пропал и last_post_date надо
+        пересчитать.
+        """
+        current = deltas.setdefault(author_id, {})
+        for name, value in delta.items():
+            if name == 'latest':
+                current[name] = max(current.get(name, value), value)
+            elif name == 'recount_latest':
+                current[name] = current.get(name, False) or value
+            else:
+                current[name] = current.get(name, 0) + value
+        return deltas
+
+    @classmethod
+    def add_post(cls, deltas, state, sign):
+        """Копит вклад поста state (см. POST_FIELDS) со знаком sign."""
+        author_id, is_visible, pub_date = state
+        if not is_visible:
+            return cls.add(deltas, author_id, post_count=sign)
+        if sign > 0:
+            return cls.add(
+                deltas, author_id, post_count=1, published_count=1,
+                latest=pub_date
+            )
+        return cls.add(
+            deltas, author_id, post_count=-1, published_count=-1,
+            recount_latest=True
+        )
+
+    @classmethod
+    def add_post_changes(cls, deltas, before, after):
+        """Копит разницу вкладов постов {pk: state} до и после записи."""
+        for pk in before.keys() | after.keys():
+            if before.get(pk) == after.get(pk):
+                continue
+            if pk in before:
+                cls.add_post(deltas, before[pk], -1)
+            if pk in after:
+                cls.add_post(deltas, after[pk], 1)
+        return deltas
+
+    @classmethod
+    def apply(cls, deltas, create=True):
+        """Применяет накопленные приращения без пересчёта постов.
+
+        Счётчики меняются через F(), last_post_date сдвигается вперёд
+        или пересчитывается одним подзапросом. Авторы с одинаковыми
+        приращениями обновляются одним UPDATE. Строки, которых ещё нет,
+        считает целиком refresh().
+        """
+        deltas = {
+            pk: delta for pk, delta in deltas.items() if any(delta.values())
+        }
+        if not deltas:
+            return
+        existing = set(cls.objects.filter(
+            author_id__in=deltas
+        ).values_list('author_id', flat=True))
+        cls.refresh(deltas.keys() - existing, create=create)
+        groups = {}
+        for pk in existing:
+            groups.setdefault(
+                tuple(sorted(deltas[pk].items())), []
+            ).append(pk)
+        for delta, author_ids in groups.items():
+            delta = dict(delta)
+            values = {
+                name: F(name) + delta[name]
+                for name in cls.COUNTERS if delta.get(name)
+            }
+            if delta.get('recount_latest'):
+                values['last_post_date'] = cls.per_author(
+                    Post.objects.filter(is_visible=True), Max('pub_date')
+                )
+            elif delta.get('latest'):
+                latest = Value(delta['latest'])
+                values['last_post_date'] = Greatest(
+                    Coalesce('last_post_date', latest), latest
+                )
+            if values:
+                cls.objects.filter(author_id__in=author_ids).update(**values)
+
+    def __str__(self):
+        return f'{self.author_id}: {self.post_count}'
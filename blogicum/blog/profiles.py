@@ -0,0 +1,43 @@
+from django.core.cache import cache
+from django.http import Http404
+
+from core.cache import versioned_key
+
+from .models import User
+
+# Публичные поля профиля; пароль и прочие служебные поля в кэш не попадают.
+PROFILE_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'date_joined', 'is_staff'
+)
+PROFILE_CACHE_NAMESPACE = 'profiles'
+PROFILE_CACHE_TIMEOUT = 60 * 60
+
+
+def lookup_author(request, username):
+    """Автор по username: не больше одного поиска за запрос.
+
+    Свой профиль берётся из request.user, чужие — из кэша публичных
+    профилей, и лишь при промахе — одним запросом к БД.
+    """
+    authors = getattr(request, '_authors', None)
+    if authors is None:
+        authors = request._authors = {}
+    if username not in authors:
+        authors[username] = load_author(request, username)
+    return authors[username]
+
+
+def load_author(request, username):
+    user = request.user
+    if user.is_authenticated and user.username == username:
+        return user
+    key = versioned_key(PROFILE_CACHE_NAMESPACE, username)
+    author = cache.get(key)
+    if author is None:
+        author = User.objects.only(*PROFILE_FIELDS).filter(
+            username=username
+        ).first()
+        if author is None:
+            raise Http404('Пользователь не найден')
+        cache.set(key, author, PROFILE_CACHE_TIMEOUT)
+    return author
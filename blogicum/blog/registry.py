@@ -0,0 +1,71 @@
+"""Реестр категорий и местоположений в памяти процесса.
+
+Таблицы маленькие и меняются редко, поэтому каждый воркер держит их
+целиком и подставляет в посты без JOIN. Об изменениях воркеры узнают
+по версии в общем кэше, которую проверяют не чаще раза в секунду;
+свои изменения воркер видит сразу.
+"""
+import threading
+import time
+
+from core.cache import bump_version, get_version
+
+from .models import Category, Location, Post
+
+REGISTRY_NAMESPACE = 'registry'
+CHECK_INTERVAL = 1
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+        self._checked_at = 0
+
+    def _load(self):
+        categories = {
+            category.pk: category for category in Category.objects.all()
+        }
+        locations = {
+            location.pk: location for location in Location.objects.all()
+        }
+        slugs = {category.slug: category for category in categories.values()}
+        return categories, locations, slugs
+
+    def _current(self):
+        now = time.monotonic()
+        state = self._state
+        if state is not None and now - self._checked_at < CHECK_INTERVAL:
+            return state[1:]
+        with self._lock:
+            version = get_version(REGISTRY_NAMESPACE)
+            if self._state is None or self._state[0] != version:
+                self._state = (version, *self._load())
+            self._checked_at = now
+            return self._state[1:]
+
+    def invalidate(self):
+        """Сбрасывает реестр во всех воркерах."""
+        self._state = None
+        bump_version(REGISTRY_NAMESPACE)
+
+    def category_by_slug(self, slug):
+        return self._current()[2].get(slug)
+
+    def attach(self, posts):
+        """Подставляет в посты категории и местоположения из реестра."""
+        categories, locations, _ = self._current()
+        category_field = Post._meta.get_field('category')
+        location_field = Post._meta.get_field('location')
+        for post in posts:
+            category_field.set_cached_value(
+                post, categories.get(post.category_id)
+            )
+            location_field.set_cached_value(
+                post, locations.get(post.location_id)
+            )
+        return posts
+
+
+registry = Registry()
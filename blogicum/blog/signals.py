@@ -0,0 +1,121 @@
+import threading
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.cache import bump_version
+
+from .bulk import run_in_batches, update_objects
+from .feeds import FEED_CACHE_NAMESPACE
+from .models import (
+    AuthorStats,
+    Category,
+    Change,
+    Comment,
+    Location,
+    Post,
+    User,
+    changes_recorded,
+)
+from .profiles import PROFILE_CACHE_NAMESPACE
+from .registry import registry
+from .tracking import TRACKED_MODELS
+
+
+def log_save(sender, instance, **kwargs):
+    Change.record(sender, [instance.pk], Change.SAVED)
+
+
+def log_delete(sender, instance, **kwargs):
+    Change.record(sender, [instance.pk], Change.DELETED)
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(log_save, sender=model)
+    post_delete.connect(log_delete, sender=model)
+
+
+@receiver(changes_recorded)
+def invalidate_feeds(sender, **kwargs):
+    if sender in (Category, Location, Post):
+        bump_version(FEED_CACHE_NAMESPACE)
+    if sender in (Category, Location):
+        registry.invalidate()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_profiles(sender, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login — профиль не меняется.
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_version(PROFILE_CACHE_NAMESPACE)
+    bump_version(FEED_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    before = instance._stats_in_db
+    if not created and (before is None or None in before):
+        # Пост загружен без нужных полей: прежний вклад неизвестен.
+        AuthorStats.refresh([instance.author_id])
+        return
+    AuthorStats.apply(AuthorStats.add_post_changes(
+        {}, {} if created else {instance.pk: before},
+        {instance.pk: instance.stats_state()}
+    ))
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    if created:
+        AuthorStats.apply({instance.author_id: {'comment_count': 1}})
+    elif instance._author_in_db is None:
+        AuthorStats.refresh([instance.author_id])
+    elif instance._author_in_db != instance.author_id:
+        AuthorStats.apply({
+            instance._author_in_db: {'comment_count': -1},
+            instance.author_id: {'comment_count': 1},
+        })
+
+
+# Удаления этого потока: id(origin) -> [origin, осталось объектов,
+# приращения]. Удаление поста каскадом удаляет и комментарии; Django
+# шлёт pre_delete всем объектам до удаления и post_delete после, так что
+# приращения копятся и применяются одним UPDATE в той же транзакции.
+_deletions = threading.local()
+
+
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Comment)
+def count_deleted(sender, instance, origin=None, **kwargs):
+    pending = _deletions.__dict__.setdefault('pending', {})
+    # Ссылка на origin не даёт его id достаться другому удалению.
+    deletion = pending.setdefault(id(origin), [origin, 0, {}])
+    deletion[1] += 1
+    if sender is Post:
+        AuthorStats.add_post(deletion[2], instance.stats_state(), -1)
+    else:
+        AuthorStats.add(deletion[2], instance.author_id, comment_count=-1)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def apply_deleted(sender, instance, origin=None, **kwargs):
+    pending = _deletions.__dict__.get('pending', {})
+    deletion = pending.get(id(origin))
+    if deletion is None:
+        return
+    deletion[1] -= 1
+    if not deletion[1]:
+        del pending[id(origin)]
+        AuthorStats.apply(deletion[2], create=False)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    # Посты удаляемой категории остаются без неё и перестают быть видны.
+    pks = list(instance.posts.filter(is_visible=True).order_by(
+        'pk'
+    ).values_list('pk', flat=True))
+    run_in_batches(pks, update_objects(Post, is_visible=False))
@@ -0,0 +1,53 @@
+"""Модели журнала изменений и вставка записей с заданными датами.
+
+Модуль зависит только от моделей, поэтому его импортируют и сигналы,
+и обмен данными, и очередь комментариев без циклических импортов.
+"""
+from django.db import models
+
+from .models import Category, Comment, Location, Post
+
+# Модели, изменения которых записываются в журнал Change.
+TRACKED_MODELS = (Category, Location, Post, Comment)
+
+
+def timestamp_fields(model):
+    """Поля модели, которые save() и bulk_create заполняют текущим временем."""
+    return [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+
+def bulk_create_with_timestamps(model, objs, key='pk', **kwargs):
+    """bulk_create, оставляющий объектам их даты создания и изменения.
+
+    bulk_create подставляет текущее время в поля auto_now и auto_now_add,
+    поэтому заданные даты возвращаются вторым запросом — bulk_update
+    обычного QuerySet, который сам дат не трогает. Сами поля модели не
+    перенастраиваются, и параллельные сохранения получают обычные даты.
+    Объектам без pk (ignore_conflicts) он находится по уникальному key.
+    """
+    fields = timestamp_fields(model)
+    dates = [
+        {field.attname: getattr(obj, field.attname) for field in fields}
+        for obj in objs
+    ]
+    model.objects.bulk_create(objs, **kwargs)
+    if key != 'pk' and any(obj.pk is None for obj in objs):
+        pks = dict(model.objects.filter(**{
+            f'{key}__in': [getattr(obj, key) for obj in objs]
+        }).values_list(key, 'pk'))
+        for obj in objs:
+            obj.pk = pks.get(getattr(obj, key))
+    for obj, values in zip(objs, dates):
+        for attname, value in values.items():
+            if value is not None:
+                setattr(obj, attname, value)
+    if fields:
+        models.QuerySet(model).bulk_update(
+            [obj for obj in objs if obj.pk is not None],
+            [field.name for field in fields]
+        )
+    return objs
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -48,4 +48,25 @@ urlpatterns = [
     # Редактирование поста
     path('posts/<int:post_id>/edit/', views.PostUpdateView.as_view(),
          name='edit_post'),
+
+    # RSS и Atom ленты всего блога, категории и автора
+    path('feeds/rss/', feeds.cached_feed(feeds.PostsFeed()),
+         name='posts_rss'),
+    path('feeds/atom/', feeds.cached_feed(feeds.PostsAtomFeed()),
+         name='posts_atom'),
+    path('feeds/category/<slug:category_slug>/rss/',
+         feeds.cached_feed(feeds.CategoryFeed()),
+         name='category_rss'),
+    path('feeds/category/<slug:category_slug>/atom/',
+         feeds.cached_feed(feeds.CategoryAtomFeed()),
+         name='category_atom'),
+    path('feeds/author/<str:username>/rss/',
+         feeds.cached_feed(feeds.AuthorFeed()),
+         name='author_rss'),
+    path('feeds/author/<str:username>/atom/',
+         feeds.cached_feed(feeds.AuthorAtomFeed()),
+         name='author_atom'),
+
+    # Журнал изменений для инкрементальной синхронизации
+    path('changes/', views.ChangeFeedView.as_view(), name='changes'),
 ]
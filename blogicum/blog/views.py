@@ -1,57 +1,81 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db.models import Count, Max, Q
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
-from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
     ListView,
     UpdateView,
+    View,
 )
 
+from . import comment_queue
 from .forms import CommentForm, PostForm, ProfileEditForm
 from .mixins import (
     BasePostMixin,
     CommentBaseMixin,
     CommentObjectMixin,
+    ConditionalGetMixin,
     OwnerRequiredMixin,
+    RateLimitMixin,
+    RegistryRelatedMixin,
+    StreamingFeedMixin,
 )
-from .models import Category, Post, User
+from .models import AuthorStats, Category, Change, Comment, Post, User
+from .profiles import lookup_author
+from .registry import registry
+from .watermarks import change_watermark, get_validators
 
 PAGINATE_BY = 10
+CHANGES_BATCH_SIZE = 500
 
 
 def process_posts(posts=Post.objects.all(), apply_filters=True,
                   use_select_related=True,
-                  apply_annotation=True):
-    """Фильтрация, аннотирование и сортировка постов."""
+                  apply_annotation=True, profile='card'):
+    """Фильтрация, аннотирование и сортировка постов.
+
+    Категории и местоположения не присоединяются: публикацию категории
+    учитывает is_visible, а сами объекты подставляет реестр
+    (см. RegistryRelatedMixin). profile выбирает набор загружаемых полей
+    из PostQuerySet.FIELD_PROFILES.
+    """
     if apply_filters:
-        posts = posts.filter(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=timezone.now()
-        )
+        posts = posts.filter(is_visible=True)
     if use_select_related:
-        posts = posts.select_related('category', 'location', 'author')
+        posts = posts.select_related('author')
+    if profile:
+        posts = posts.with_profile(profile)
     if apply_annotation:
         posts = posts.annotate(
             comment_count=Count('comments')).order_by(*Post._meta.ordering)
     return posts
 
 
-class PostListView(ListView):
+class PostListView(ConditionalGetMixin, StreamingFeedMixin, ListView):
     """Список всех опубликованных постов."""
 
     model = Post
     template_name = 'blog/index.html'
     context_object_name = 'post_list'
     paginate_by = PAGINATE_BY
-    queryset = process_posts()
+
+    def get_queryset(self):
+        return process_posts()
+
+    def get_validators(self):
+        return get_validators(
+            Change.objects.aggregate(state_changes=Max('seq'))
+        )
 
 
-class CategoryPostsView(ListView):
+class CategoryPostsView(ConditionalGetMixin, StreamingFeedMixin, ListView):
     """Отображение постов в категории."""
 
     model = Post
@@ -60,38 +84,89 @@ class CategoryPostsView(ListView):
     paginate_by = PAGINATE_BY
 
     def get_category(self):
-        return get_object_or_404(
-            Category, slug=self.kwargs['category_slug'], is_published=True
-        )
+        category = registry.category_by_slug(self.kwargs['category_slug'])
+        if category is None or not category.is_published:
+            raise Http404('Категория не найдена')
+        return category
 
     def get_queryset(self):
-        return process_posts(self.get_category().posts.all())
+        self.category = self.get_category()
+        return process_posts(Post.objects.filter(category=self.category))
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(**kwargs, category=self.category)
+
+    def get_validators(self):
+        return get_validators(Category.objects.filter(
+            slug=self.kwargs['category_slug'], is_published=True
+        ).values('pk').annotate(
+            state_changes=change_watermark()
+        ).first())
 
 
-class PostDetailView(BasePostMixin, DetailView):
+class PostDetailView(ConditionalGetMixin, BasePostMixin, DetailView):
     """Детали поста."""
 
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
+    def get_validators(self):
+        state = Post.objects.filter(
+            pk=self.kwargs[self.pk_url_kwarg]
+        ).values('author__username').annotate(
+            state_changes=change_watermark()
+        ).first()
+        if state is not None and self.pending_comments:
+            # Иначе после отправки комментария браузер получит 304.
+            state['pending_comments'] = ','.join(
+                entry['id'] for entry in self.pending_comments
+            )
+        return get_validators(state)
+
+    @cached_property
+    def pending_comments(self):
+        """Комментарии пользователя, ещё не записанные из очереди."""
+        if not (settings.COMMENT_QUEUE
+                and self.request.user.is_authenticated):
+            return []
+        return comment_queue.pending(
+            self.kwargs[self.pk_url_kwarg], self.request.user.pk
+        )
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(
+            'author'
+        ).with_profile('detail')
+
     def get_object(self):
         post = super().get_object()
-        if self.request.user == post.author:
-            return post
-        return super().get_object(process_posts(
-            use_select_related=False,
-            apply_annotation=False
-        ))
+        if self.request.user != post.author:
+            post = super().get_object(process_posts(
+                apply_annotation=False, profile='detail'
+            ))
+        return registry.attach([post])[0]
 
     def get_context_data(self, **kwargs):
         return super().get_context_data(
             **kwargs,
             form=CommentForm(),
-            comments=self.get_object().comments.all()
+            comments=self.object.comments.select_related(
+                'author'
+            ).order_by('path'),
+            pending_comments=[
+                Comment(
+                    post=self.object,
+                    author=self.request.user,
+                    text=entry['text'],
+                    created_at=parse_datetime(entry['created_at']),
+                )
+                for entry in self.pending_comments
+            ],
         )
 
 
-class PostCreateView(BasePostMixin, LoginRequiredMixin, CreateView):
+class PostCreateView(BasePostMixin, LoginRequiredMixin, RateLimitMixin,
+                     CreateView):
     """Создание нового поста."""
 
     form_class = PostForm
@@ -122,14 +197,25 @@ class PostDeleteView(BasePostMixin, LoginRequiredMixin,
     """Удаление поста."""
 
 
-class ProfileView(ListView):
+class ProfileView(ConditionalGetMixin, RegistryRelatedMixin, ListView):
     """Профиль пользователя."""
 
     template_name = 'blog/profile.html'
     paginate_by = PAGINATE_BY
 
+    def get_validators(self):
+        # Правки профиля в журнал не попадают, поэтому поля пользователя
+        # входят в состояние сами.
+        return get_validators(User.objects.filter(
+            username=self.kwargs['username']
+        ).values(
+            'first_name', 'last_name', 'is_staff', 'date_joined',
+            'stats__post_count', 'stats__published_count',
+            'stats__comment_count', 'stats__last_post_date',
+        ).annotate(state_changes=change_watermark()).first())
+
     def get_author(self):
-        return get_object_or_404(User, username=self.kwargs['username'])
+        return lookup_author(self.request, self.kwargs['username'])
 
     def get_queryset(self):
         author = self.get_author()
@@ -141,7 +227,8 @@ class ProfileView(ListView):
         return super().get_context_data(
             **kwargs,
             profile=self.get_author(),
-            is_owner=self.request.user == self.get_author()
+            is_owner=self.request.user == self.get_author(),
+            stats=AuthorStats.objects.filter(author=self.get_author()).first()
         )
 
 
@@ -159,12 +246,49 @@ class ProfileEditView(LoginRequiredMixin, UpdateView):
         return reverse('blog:profile', args=[self.request.user.username])
 
 
-class CommentCreateView(CommentBaseMixin, CreateView):
+class CommentCreateView(CommentBaseMixin, RateLimitMixin, CreateView):
     """Создание комментария к посту."""
 
+    def get_parent_id(self):
+        """Номер комментария, на который отвечают, из поля parent."""
+        parent_id = self.request.POST.get('parent', '')
+        if not parent_id:
+            return None
+        if not parent_id.isdigit():
+            raise Http404
+        return int(parent_id)
+
     def form_valid(self, form):
+        parent_id = self.get_parent_id()
+        if settings.COMMENT_QUEUE:
+            # Один EXISTS вместо загрузки поста: пост доступен автору
+            # комментария, а родитель из того же поста. Удалённое позже
+            # отбросит flush_comments.
+            posts = Post.objects.filter(
+                Q(is_visible=True) | Q(author=self.request.user),
+                pk=self.kwargs['post_id'],
+            )
+            if parent_id is not None:
+                posts = posts.filter(comments__pk=parent_id)
+            if not posts.exists():
+                raise Http404
+            comment_queue.enqueue(
+                self.kwargs['post_id'], self.request.user.pk,
+                form.cleaned_data['text'], parent_id
+            )
+            return redirect(self.get_success_url())
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
+        if parent_id is None:
+            form.instance.post = get_object_or_404(
+                Post, pk=self.kwargs['post_id']
+            )
+        else:
+            # Родитель из этого поста подтверждает и существование поста.
+            form.instance.parent = get_object_or_404(
+                Comment.objects.only('post_id', 'path'),
+                pk=parent_id, post_id=self.kwargs['post_id']
+            )
+            form.instance.post_id = form.instance.parent.post_id
         return super().form_valid(form)
 
 
@@ -176,3 +300,26 @@ class CommentUpdateView(CommentBaseMixin, OwnerRequiredMixin,
 class CommentDeleteView(LoginRequiredMixin, OwnerRequiredMixin,
                         CommentObjectMixin, DeleteView):
     """Удаление комментария."""
+
+
+class ChangeFeedView(UserPassesTestMixin, View):
+    """Журнал изменений после заданного номера, порциями."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        try:
+            since = int(request.GET.get('since', 0))
+            limit = int(request.GET.get('limit', CHANGES_BATCH_SIZE))
+        except ValueError:
+            return HttpResponseBadRequest('since и limit должны быть числами')
+        limit = max(1, min(limit, CHANGES_BATCH_SIZE))
+        changes = [
+            change.as_dict()
+            for change in Change.objects.filter(seq__gt=since)[:limit]
+        ]
+        return JsonResponse({
+            'changes': changes,
+            'next': changes[-1]['seq'] if changes else since,
+        })
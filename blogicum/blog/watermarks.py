@@ -0,0 +1,22 @@
+from django.db.models import Subquery
+
+from .models import Change
+
+
+def change_watermark():
+    """Номер последней записи журнала изменений.
+
+    Журнал пополняется при любом сохранении и удалении категорий,
+    местоположений, постов и комментариев, в том числе при массовых
+    update() и каскадах видимости, поэтому номер меняется при любом
+    изменении страниц блога. Последний номер — один шаг по индексу
+    первичного ключа, сколько бы ни было постов и комментариев.
+    """
+    return Subquery(Change.objects.order_by('-seq').values('seq')[:1])
+
+
+def get_validators(state):
+    """Состояние для ETag в постоянном порядке."""
+    if state is None:
+        return None
+    return sorted(state.items())
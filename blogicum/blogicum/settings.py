@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -23,8 +26,12 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-=so#m)qrz6k4t)pbahg32zdej=gl4g&m#cppm=bcrcjqfjq2!q'
 
+# Боевой режим: без отладки, с кэшированием шаблонов и статикой
+# с хэшами содержимого в именах файлов.
+PRODUCTION = os.getenv('BLOGICUM_PRODUCTION', '') == '1'
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = not PRODUCTION
 
 ALLOWED_HOSTS = ['127.0.0.1',]
 
@@ -47,14 +54,62 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.NotFoundThrottleMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.PrerenderedPagesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Сжатие ответов (core.middleware.CompressionMiddleware): меньшие ответы
+# не окупают заголовки gzip, остальные типы уже сжаты.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = {
+    'text/html',
+    'text/plain',
+    'text/css',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+}
+
+# Потоковая отдача ленты и страниц категорий (blog.mixins.StreamingFeedMixin):
+# первый байт уходит до чтения постов. Тестовый клиент не читает
+# потоковые ответы как обычные, поэтому по умолчанию выключено.
+STREAMING_FEEDS = os.getenv('BLOGICUM_STREAMING_FEEDS', '') == '1'
+
+# Заранее отрендеренные статичные страницы и страницы ошибок
+# (core.prerender, команда prerender_pages).
+PRERENDER_ROOT = BASE_DIR / 'prerendered'
+PRERENDER_PAGES = PRODUCTION
+
+# Сколько ответов 404 один IP может получить за окно в секундах, прежде
+# чем его запросы начнут отклоняться с 429 (NotFoundThrottleMiddleware).
+# None отключает ограничение: при разработке и в тестах все запросы
+# идут с одного адреса.
+NOT_FOUND_LIMIT = 50 if PRODUCTION else None
+NOT_FOUND_WINDOW = 60
+
+# Лимиты на запись (core.ratelimit): {имя view: {вид: (запросов, секунд)}},
+# вид — 'user' или 'ip'. Как и NOT_FOUND_LIMIT, включены только
+# в продакшене.
+RATE_LIMITS = {
+    'blog:add_comment': {'user': (5, 60), 'ip': (30, 60)},
+    'blog:create_post': {'user': (10, 3600), 'ip': (30, 3600)},
+} if PRODUCTION else {}
+
+# Отложенная запись комментариев (blog.comment_queue): комментарии
+# копятся в очереди в COMMENT_QUEUE_ROOT, а в БД их порциями записывает
+# команда flush_comments, которую нужно держать запущенной с --loop.
+COMMENT_QUEUE = os.getenv('BLOGICUM_COMMENT_QUEUE', '') == '1'
+COMMENT_QUEUE_ROOT = BASE_DIR / 'comment_queue'
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -63,18 +118,40 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': not PRODUCTION,
         'OPTIONS': {
             'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.measured',
             ],
         },
     },
 ]
 
+# Контекст-процессоры, которые запускает и замеряет
+# core.context_processors.measured.
+CONTEXT_PROCESSORS = [
+    'django.template.context_processors.request',
+    'core.context_processors.auth',
+    'core.context_processors.messages',
+]
+if DEBUG:
+    CONTEXT_PROCESSORS.insert(0, 'django.template.context_processors.debug')
+
+# Админка ищет стандартные процессоры только в TEMPLATES; вместо её
+# проверок наличие процессоров и их замен из CONTEXT_PROCESSORS проверяют
+# core.E002, core.E003 и core.W001.
+SILENCED_SYSTEM_CHECKS = ['admin.E402', 'admin.E404', 'admin.W411']
+
+if PRODUCTION:
+    # Шаблоны читаются с диска и компилируются один раз за жизнь процесса
+    # (см. команду warm_templates).
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
@@ -89,6 +166,41 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# По умолчанию кэш живёт в памяти процесса; при нескольких воркерах
+# задайте общий бэкенд, например Redis или memcached.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'BLOGICUM_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('BLOGICUM_CACHE_LOCATION', ''),
+    }
+}
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/
+
+# Хранилище сессий: cached_db — чтение из кэша с записью в БД,
+# signed_cookies — небольшие сессии целиком в подписанной cookie,
+# db — только таблица django_session.
+SESSION_STORAGES = ('cached_db', 'signed_cookies', 'db')
+
+SESSION_STORAGE = os.getenv('BLOGICUM_SESSION_STORAGE', 'cached_db')
+
+if SESSION_STORAGE not in SESSION_STORAGES:
+    raise ImproperlyConfigured(
+        f'BLOGICUM_SESSION_STORAGE={SESSION_STORAGE!r}: ожидается одно из '
+        f'{", ".join(SESSION_STORAGES)}.'
+    )
+
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORAGE}'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -131,6 +243,22 @@ STATICFILES_DIRS = [
 
 STATIC_URL = 'static/'
 
+# Сюда collectstatic собирает статику для боевого режима.
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'core.storage.CompressedManifestStaticFilesStorage'
+            if PRODUCTION
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -143,7 +271,7 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 # Куда редиректить при попытке доступа без авторизации
 LOGIN_URL = '/auth/login/'
@@ -1,8 +1,10 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
+from core.static import serve as serve_static
+from core.views import metrics_view
 from users.views import logout_user
 
 urlpatterns = [
@@ -23,10 +25,20 @@ urlpatterns = [
 
     # Включение URL-адресов для статичных страниц
     path('pages/', include('pages.urls')),
+
+    # Счётчики производительности для персонала
+    path('metrics/', metrics_view, name='metrics'),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
+if settings.PRODUCTION:
+    # Собранная статика с вечным кэшем для файлов с хэшем в имени.
+    urlpatterns += [
+        re_path(rf'^{settings.STATIC_URL.lstrip("/")}(?P<path>.*)$',
+                serve_static),
+    ]
+
 # Обработчик ошибок 404
-handler404 = 'core.views.page_not_found'
+handler404 = 'pages.views.page_not_found'
 
 # Обработчик ошибок 500
-handler500 = 'core.views.server_error'
+handler500 = 'pages.views.server_error'
@@ -9,8 +9,17 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+if settings.PRODUCTION:
+    # Кэширующий загрузчик держит шаблоны до перезапуска: компилируем
+    # их сразу, а не на первых запросах. С gunicorn --preload прогретый
+    # кэш достаётся всем воркерам.
+    from core.templating import warm_templates
+
+    warm_templates()
@@ -0,0 +1,43 @@
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_TIMEOUT = None
+
+
+def get_version(namespace):
+    """Текущая версия пространства имён кэша.
+
+    Версия — случайный токен, а не счётчик: если кэш вытеснит ключ
+    версии, новый токен не совпадёт ни с одной старой записью.
+    """
+    key = f'version:{namespace}'
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(key, version, VERSION_TIMEOUT)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(namespace):
+    """Делает устаревшими все записи пространства имён.
+
+    Версия меняется сразу и ещё раз после коммита: иначе параллельный
+    запрос успел бы закэшировать данные, прочитанные до коммита.
+    """
+    def bump():
+        cache.set(f'version:{namespace}', uuid.uuid4().hex, VERSION_TIMEOUT)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def versioned_key(namespace, *parts):
+    """Ключ кэша, привязанный к текущей версии пространства имён."""
+    digest = hashlib.md5(
+        '|'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'{namespace}:{get_version(namespace)}:{digest}'
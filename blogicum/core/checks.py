@@ -0,0 +1,73 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+from .templating import warm_templates
+
+MEASURED = 'core.context_processors.measured'
+# Что нужно админке и чем это можно обеспечить: стандартный процессор
+# или его замена из core.context_processors.
+ADMIN_PROCESSORS = (
+    (
+        ('django.contrib.auth.context_processors.auth',
+         'core.context_processors.auth'),
+        Error, 'core.E002',
+    ),
+    (
+        ('django.contrib.messages.context_processors.messages',
+         'core.context_processors.messages'),
+        Error, 'core.E003',
+    ),
+    (
+        ('django.template.context_processors.request',),
+        Warning, 'core.W001',
+    ),
+)
+
+
+@register(Tags.templates)
+def check_templates_compile(app_configs, **kwargs):
+    """Каждый шаблон проекта должен компилироваться."""
+    return [
+        Error(
+            f'Шаблон {name} не компилируется: {error}',
+            hint='Исправьте синтаксис шаблона.',
+            id='core.E001',
+        )
+        for name, error in warm_templates()
+    ]
+
+
+@register(Tags.admin, Tags.templates)
+def check_admin_context_processors(app_configs, **kwargs):
+    """Админке нужны user, perms, messages и request в контексте.
+
+    Стандартные проверки admin.E402, admin.E404 и admin.W411 заглушены:
+    они ищут процессоры только по именам в TEMPLATES и не видят
+    CONTEXT_PROCESSORS, которые запускает measured. Эта проверка ищет
+    там же, где их на самом деле берёт шаблонизатор.
+    """
+    if not apps.is_installed('django.contrib.admin'):
+        return []
+    engine = next((
+        engine.engine for engine in engines.all()
+        if isinstance(engine, DjangoTemplates)
+    ), None)
+    if engine is None:
+        return []
+    processors = set(engine.context_processors)
+    if MEASURED in processors:
+        processors.update(settings.CONTEXT_PROCESSORS)
+    return [
+        level(
+            f'Админке нужен контекст-процессор {names[0]}'
+            + (f' или {names[1]}' if len(names) > 1 else '') + '.',
+            hint=f'Добавьте его в CONTEXT_PROCESSORS (через {MEASURED}) '
+                 'или в TEMPLATES.',
+            id=check_id,
+        )
+        for names, level, check_id in ADMIN_PROCESSORS
+        if processors.isdisjoint(names)
+    ]
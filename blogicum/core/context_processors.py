@@ -0,0 +1,56 @@
+"""Контекст-процессоры шаблонов, не трогающие сессию без нужды.
+
+Гость без cookie сессии заведомо анонимен и не может иметь сообщений
+в сессии, поэтому для него пользователь и сообщения подставляются
+сразу, без загрузки сессии. measured() запускает процессоры из
+настройки CONTEXT_PROCESSORS и замеряет время каждого.
+"""
+import functools
+import time
+
+from django.conf import settings
+from django.contrib.auth import context_processors as auth_processors
+from django.contrib.auth.context_processors import PermWrapper
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages import context_processors as message_processors
+from django.contrib.messages.constants import DEFAULT_LEVELS
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+
+def has_session(request):
+    return settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def auth(request):
+    """Переменные user и perms; гостю без сессии — без обращения к ней."""
+    if has_session(request):
+        return auth_processors.auth(request)
+    user = AnonymousUser()
+    return {'user': user, 'perms': PermWrapper(user)}
+
+
+def messages(request):
+    """Ленивые сообщения; без сессии и cookie сообщений — пустой список."""
+    if has_session(request) or 'messages' in request.COOKIES:
+        return message_processors.messages(request)
+    return {'messages': (), 'DEFAULT_MESSAGE_LEVELS': DEFAULT_LEVELS}
+
+
+@functools.cache
+def load(paths):
+    return [(path, import_string(path)) for path in paths]
+
+
+def measured(request):
+    """Запускает CONTEXT_PROCESSORS, записывая время каждого в метрики."""
+    context = {}
+    for path, processor in load(tuple(settings.CONTEXT_PROCESSORS)):
+        started = time.perf_counter()
+        context.update(processor(request))
+        metrics.record(
+            'context_processors', path,
+            seconds=time.perf_counter() - started
+        )
+    return context
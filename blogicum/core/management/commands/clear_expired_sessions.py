@@ -0,0 +1,50 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии порциями, не блокируя таблицу надолго. '
+        'Запускайте по расписанию, например из cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько сессий удалять одной транзакцией.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза между порциями, секунды.'
+        )
+
+    def handle(self, *args, batch_size, pause, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write(
+                f'Хранилище {settings.SESSION_ENGINE} не держит сессии в БД, '
+                'очищать нечего.'
+            )
+            return
+        sessions = store.get_model_class().objects
+        now = timezone.now()
+        deleted = 0
+        while True:
+            batch = list(sessions.filter(
+                expire_date__lt=now
+            ).values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                sessions.filter(pk__in=batch).delete()
+            deleted += len(batch)
+            if pause:
+                time.sleep(pause)
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено истёкших сессий: {deleted}')
+        )
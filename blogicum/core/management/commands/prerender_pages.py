@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import prerender
+
+
+class Command(BaseCommand):
+    help = (
+        'Рендерит статичные страницы и страницы ошибок в хранилище '
+        'PRERENDER_ROOT. Запускайте при выкладке, перед стартом воркеров.'
+    )
+
+    def handle(self, *args, **options):
+        blobs = prerender.render_all()
+        prerender.write(settings.PRERENDER_ROOT, blobs)
+        self.stdout.write(self.style.SUCCESS(
+            f'Страниц отрендерено: {len(blobs)}'
+        ))
@@ -0,0 +1,52 @@
+import base64
+import hashlib
+import re
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_bootstrap5.core import get_bootstrap_setting
+
+from core.templatetags.assets import VENDORED_BOOTSTRAP_CSS
+
+# Ссылку на карту исходников манифест-хранилище попыталось бы
+# разрешить, а самой карты у нас нет.
+SOURCE_MAP = re.compile(rb'/\*# sourceMappingURL=[^*]*\*/\s*$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Скачивает стили Bootstrap с CDN в статику проекта, проверяя '
+        'их по хэшу integrity из настроек django-bootstrap5.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout', type=float, default=30,
+            help='Таймаут загрузки, секунды.'
+        )
+
+    def handle(self, *args, timeout, **options):
+        css_url = get_bootstrap_setting('css_url')
+        try:
+            with urlopen(css_url['url'], timeout=timeout) as response:
+                content = response.read()
+        except URLError as error:
+            raise CommandError(f'Не удалось скачать {css_url["url"]}: {error}')
+        integrity = css_url.get('integrity')
+        if integrity:
+            algorithm, expected = integrity.split('-', 1)
+            digest = base64.b64encode(
+                hashlib.new(algorithm, content).digest()
+            ).decode()
+            if digest != expected:
+                raise CommandError(
+                    f'Файл {css_url["url"]} не совпадает с integrity'
+                )
+        target = settings.BASE_DIR / 'static' / VENDORED_BOOTSTRAP_CSS
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(SOURCE_MAP.sub(b'', content))
+        self.stdout.write(self.style.SUCCESS(
+            f'Bootstrap сохранён в {target.relative_to(settings.BASE_DIR)}'
+        ))
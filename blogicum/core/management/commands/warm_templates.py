@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templating import project_template_names, warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и сообщает об ошибках. '
+        'Веб-процесс в боевом режиме прогревает шаблоны сам при старте '
+        '(blogicum/wsgi.py); команда нужна для проверки перед выкладкой.'
+    )
+    # Ошибки шаблонов команда выводит сама, подробнее системной проверки.
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        errors = warm_templates()
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Не компилируются шаблоны: {len(errors)}')
+        total = len(project_template_names())
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {total} за {elapsed:.2f} с'
+        ))
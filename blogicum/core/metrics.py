@@ -0,0 +1,34 @@
+"""Простые счётчики производительности внутри процесса.
+
+Значения копятся отдельно в каждом воркере и сбрасываются при его
+перезапуске: этого хватает, чтобы сравнить view между собой и увидеть
+эффект изменений, не поднимая отдельную систему метрик.
+"""
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+
+
+def record(group, name, **values):
+    """Увеличивает счётчик вызовов и прибавляет values к счётчикам name."""
+    with _lock:
+        counters = _counters[group][name]
+        counters['count'] += 1
+        for key, value in values.items():
+            counters[key] += value
+
+
+def snapshot():
+    """Копия всех счётчиков: {группа: {имя: {счётчик: значение}}}."""
+    with _lock:
+        return {
+            group: {name: dict(counters) for name, counters in names.items()}
+            for group, names in _counters.items()
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
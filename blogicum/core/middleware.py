@@ -0,0 +1,123 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics, prerender, ratelimit
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip для текстовых ответов крупнее порога с метриками по view.
+
+    Сжимаются только типы из COMPRESSION_CONTENT_TYPES: картинки и прочие
+    медиа уже сжаты. Потоковые ответы сжимаются по мере отдачи.
+    """
+
+    def should_compress(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type.strip() not in settings.COMPRESSION_CONTENT_TYPES:
+            return False
+        return (
+            response.streaming
+            or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
+
+    def process_response(self, request, response):
+        if not self.should_compress(response):
+            return response
+        name = view_name(request)
+        if response.streaming:
+            if response.is_async:
+                return super().process_response(request, response)
+            sizes = {'bytes_in': 0, 'bytes_out': 0}
+            response.streaming_content = self.count(
+                response.streaming_content, sizes, 'bytes_in'
+            )
+            response = super().process_response(request, response)
+            if response.get('Content-Encoding') == 'gzip':
+                response.streaming_content = self.count(
+                    response.streaming_content, sizes, 'bytes_out',
+                    on_done=lambda: metrics.record('compression', name,
+                                                   **sizes)
+                )
+            return response
+        bytes_in = len(response.content)
+        started = time.perf_counter()
+        response = super().process_response(request, response)
+        if response.get('Content-Encoding') == 'gzip':
+            metrics.record(
+                'compression', name,
+                bytes_in=bytes_in,
+                bytes_out=len(response.content),
+                seconds=time.perf_counter() - started,
+            )
+        return response
+
+    @staticmethod
+    def count(chunks, sizes, key, on_done=None):
+        for chunk in chunks:
+            sizes[key] += len(chunk)
+            yield chunk
+        if on_done:
+            on_done()
+
+
+class PrerenderedPagesMiddleware(MiddlewareMixin):
+    """Отдаёт статичные страницы из хранилища prerender без рендеринга."""
+
+    def process_request(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        key = prerender.page_keys().get(request.path_info)
+        if key is None:
+            return None
+        body = prerender.get(key, request)
+        if body is None:
+            return None
+        return HttpResponse(body, content_type='text/html; charset=utf-8')
+
+
+class NotFoundThrottleMiddleware(MiddlewareMixin):
+    """Отклоняет запросы IP, который получил слишком много ответов 404.
+
+    Перебор адресов вроде /posts/<id>/ стоит запросов к БД ещё до ответа
+    404, поэтому после NOT_FOUND_LIMIT таких ответов за NOT_FOUND_WINDOW
+    секунд запросы с этого IP получают короткий ответ 429 до конца окна.
+    Стоит первым после сжатия: отклонённый запрос не читает сессию.
+    """
+
+    def key(self, request):
+        return f'not-found:{request.META.get("REMOTE_ADDR", "")}'
+
+    def process_request(self, request):
+        limit = settings.NOT_FOUND_LIMIT
+        if limit is None or cache.get(self.key(request), 0) < limit:
+            return None
+        metrics.record('errors', '404-throttled')
+        return ratelimit.too_many_requests(
+            'Слишком много запросов к несуществующим страницам.',
+            settings.NOT_FOUND_WINDOW
+        )
+
+    def process_response(self, request, response):
+        if settings.NOT_FOUND_LIMIT is not None and (
+            response.status_code == 404
+        ):
+            key = self.key(request)
+            cache.add(key, 0, settings.NOT_FOUND_WINDOW)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Окно истекло между add и incr — начинаем новое.
+                cache.set(key, 1, settings.NOT_FOUND_WINDOW)
+        return response
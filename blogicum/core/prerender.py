@@ -0,0 +1,134 @@
+"""Заранее отрендеренные статичные страницы и страницы ошибок.
+
+Страницы отличаются только шапкой: для гостя и для вошедшего
+пользователя. Команда prerender_pages рендерит оба варианта в файлы
+хранилища; вариант для вошедших рендерится для пользователя-заглушки,
+чьё имя при отдаче заменяется на настоящее. Так же подставляется адрес
+запроса, который показывает страница 404. Пока хранилище пусто или
+отключено (PRERENDER_PAGES), страницы рендерятся как обычно.
+"""
+import functools
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.template.loader import render_to_string
+from django.urls import resolve, reverse
+from django.utils.html import escape
+
+ANONYMOUS = 'anonymous'
+AUTHENTICATED = 'authenticated'
+USERNAME_SENTINEL = 'prerendered-username-5c1e'
+URL_SENTINEL = 'prerendered-url-5c1e'
+
+# Ключ -> имя URL статичной страницы.
+PAGES = {
+    'about': 'pages:about',
+    'rules': 'pages:rules',
+}
+# Ключ -> шаблон страницы ошибки.
+ERROR_PAGES = {
+    '404': 'pages/404.html',
+    '500': 'pages/500.html',
+    '403csrf': 'pages/403csrf.html',
+}
+
+
+def variant_users():
+    return {
+        ANONYMOUS: AnonymousUser(),
+        AUTHENTICATED: get_user_model()(username=USERNAME_SENTINEL),
+    }
+
+
+def render_all():
+    """Рендерит все страницы: {(ключ, вариант): байты}."""
+    # Нужен только команде prerender_pages, веб-процессу — нет.
+    from django.test import RequestFactory
+
+    factory = RequestFactory()
+    blobs = {}
+    for variant, user in variant_users().items():
+        for key, url_name in PAGES.items():
+            path = reverse(url_name)
+            request = factory.get(path)
+            request.user = user
+            if variant == AUTHENTICATED:
+                # Без cookie сессии контекст-процессор auth сочтёт
+                # запрос гостевым (см. core.context_processors).
+                request.COOKIES[settings.SESSION_COOKIE_NAME] = 'prerender'
+            match = request.resolver_match = resolve(path)
+            response = match.func(request, *match.args, **match.kwargs)
+            blobs[key, variant] = response.render().content
+        if variant != ANONYMOUS:
+            # Страницы ошибок всегда отдаются в варианте для гостя,
+            # см. pages.views.render_error.
+            continue
+        for key, template in ERROR_PAGES.items():
+            request = factory.get('/')
+            request.user = user
+            request.build_absolute_uri = lambda location=None: URL_SENTINEL
+            blobs[key, variant] = render_to_string(
+                template, request=request
+            ).encode()
+    return blobs
+
+
+def write(root, blobs):
+    """Записывает страницы в каталог root, заменяя каждый файл атомарно."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    for (key, variant), content in blobs.items():
+        path = root / f'{key}.{variant}.html'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_bytes(content)
+        os.replace(temporary, path)
+
+
+@functools.cache
+def read(root):
+    """Страницы из каталога root; читаются один раз за жизнь процесса."""
+    blobs = {}
+    root = Path(root)
+    if root.is_dir():
+        for path in root.glob('*.html'):
+            key, variant = path.stem.rsplit('.', 1)
+            blobs[key, variant] = path.read_bytes()
+    return blobs
+
+
+@functools.cache
+def page_keys():
+    """Путь -> ключ статичной страницы."""
+    return {reverse(url_name): key for key, url_name in PAGES.items()}
+
+
+def get(key, request, personal=True):
+    """Готовое тело страницы key для запроса или None.
+
+    personal=False всегда отдаёт вариант для гостя и не трогает сессию
+    и пользователя, то есть обходится без запросов к БД.
+    """
+    if not settings.PRERENDER_PAGES:
+        return None
+    blobs = read(settings.PRERENDER_ROOT)
+    user = getattr(request, 'user', None)
+    authenticated = (
+        personal
+        and user is not None
+        and settings.SESSION_COOKIE_NAME in request.COOKIES
+        and user.is_authenticated
+    )
+    blob = blobs.get((key, AUTHENTICATED if authenticated else ANONYMOUS))
+    if blob is None:
+        return None
+    blob = blob.replace(
+        URL_SENTINEL.encode(), escape(request.build_absolute_uri()).encode()
+    )
+    if authenticated:
+        blob = blob.replace(
+            USERNAME_SENTINEL.encode(), escape(user.username).encode()
+        )
+    return blob
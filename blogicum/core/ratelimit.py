@@ -0,0 +1,119 @@
+"""Ограничение частоты запросов по алгоритму token bucket.
+
+У каждого пользователя и IP своя корзина на каждую область (обычно имя
+view): в ней до capacity токенов, которые восполняются равномерно за
+period секунд. Запрос забирает токен; пустая корзина означает ответ 429
+с Retry-After. Корзины хранятся в общем кэше, а если он недоступен —
+в памяти процесса, чтобы ограничение не отключалось вместе с кэшем.
+"""
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from . import metrics
+
+# Сколько корзин процесс держит в памяти, прежде чем выбросить истёкшие.
+LOCAL_PRUNE_SIZE = 10000
+# На сколько блокировок делятся корзины: запросы с разными ключами
+# почти никогда не ждут друг друга.
+LOCK_STRIPES = 64
+
+logger = logging.getLogger(__name__)
+
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+# Защищает только словарь корзин в памяти, без обращений к кэшу.
+_local_lock = threading.Lock()
+_local = {}
+
+
+def _get(key, now):
+    try:
+        return cache.get(key)
+    except Exception:
+        logger.warning('Кэш недоступен, корзина %s в памяти', key)
+    with _local_lock:
+        state, expires = _local.get(key, (None, 0))
+    return state if expires > now else None
+
+
+def _set(key, state, timeout, now):
+    try:
+        cache.set(key, state, timeout)
+        return
+    except Exception:
+        pass
+    with _local_lock:
+        if len(_local) >= LOCAL_PRUNE_SIZE:
+            for stale in [k for k, (_, exp) in _local.items() if exp <= now]:
+                del _local[stale]
+        _local[key] = (state, now + timeout)
+
+
+def take(key, capacity, period, now=None):
+    """Забирает токен из корзины.
+
+    Возвращает 0, если токен был, иначе — через сколько секунд он
+    появится. Внутри процесса одну корзину меняет один поток за раз,
+    а блокировка берётся по ключу, так что разные корзины не ждут
+    обращений друг друга к кэшу. Между процессами чтение и запись не
+    атомарны, поэтому при гонке лимит может быть превышен на пару
+    запросов; для защиты от потока записей этого достаточно.
+    """
+    now = time.time() if now is None else now
+    rate = capacity / period
+    with _locks[hash(key) % LOCK_STRIPES]:
+        state = _get(key, now)
+        if state is None:
+            tokens = capacity
+        else:
+            tokens, updated_at = state
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+        if tokens < 1:
+            return math.ceil((1 - tokens) / rate)
+        _set(key, (tokens - 1, now), math.ceil(period), now)
+        return 0
+
+
+def identities(request):
+    """Ключи корзин запроса по видам из RATE_LIMITS."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        yield 'user', str(user.pk)
+    yield 'ip', request.META.get('REMOTE_ADDR', '')
+
+
+def check(request, scope):
+    """Сколько секунд запросу ждать в области scope; 0 — можно выполнять.
+
+    Лимиты задаются в RATE_LIMITS: {область: {вид: (capacity, period)}},
+    где вид — 'user' или 'ip'. Запрос должен пройти все свои корзины;
+    отказ первой не тратит токены следующих.
+    """
+    limits = settings.RATE_LIMITS.get(scope)
+    if not limits:
+        return 0
+    for kind, ident in identities(request):
+        if kind not in limits:
+            continue
+        capacity, period = limits[kind]
+        retry_after = take(
+            f'ratelimit:{scope}:{kind}:{ident}', capacity, period
+        )
+        if retry_after:
+            metrics.record('ratelimit', scope)
+            return retry_after
+    return 0
+
+
+def too_many_requests(message, retry_after):
+    """Короткий ответ 429 без шаблона и запросов к БД."""
+    response = HttpResponse(
+        message, status=429, content_type='text/plain; charset=utf-8'
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
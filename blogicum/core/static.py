@@ -0,0 +1,58 @@
+"""Раздача собранной статики в боевом режиме без отдельного веб-сервера."""
+import functools
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+# Файлы с хэшем в имени не меняются никогда.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Прочие (например, favicon.ico по исходному имени) — час.
+DEFAULT_MAX_AGE = 60 * 60
+
+
+@functools.cache
+def hashed_names(storage):
+    """Имена с хэшем из манифеста; хранилище читает его один раз."""
+    return frozenset(getattr(storage, 'hashed_files', {}).values())
+
+
+def is_hashed(path):
+    """Имя файла содержит хэш содержимого (есть среди значений манифеста)."""
+    return path in hashed_names(staticfiles_storage)
+
+
+def serve(request, path):
+    """Отдаёт файл из STATIC_ROOT, по возможности — заранее сжатый."""
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(full_path)
+    compressed = f'{full_path}.gz'
+    has_compressed = os.path.isfile(compressed)
+    accepts_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+    response = FileResponse(
+        open(compressed if has_compressed and accepts_gzip else full_path,
+             'rb'),
+        content_type=content_type or 'application/octet-stream',
+        filename=os.path.basename(full_path)
+    )
+    if has_compressed:
+        if accepts_gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if is_hashed(path):
+        patch_cache_control(
+            response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=DEFAULT_MAX_AGE)
+    return response
@@ -0,0 +1,40 @@
+"""Хранилище собранной статики для боевого режима."""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+# Что имеет смысл сжимать: картинки PNG/JPEG уже сжаты.
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml', '.html',
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и gzip-копиями рядом.
+
+    Хэш в имени позволяет отдавать файлы с вечным кэшем, а заранее
+    сжатые копии — не сжимать их на каждый запрос (см. core.static).
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        """Пишет name.gz, если сжатие заметно уменьшает файл."""
+        with self.open(name) as source:
+            content = source.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(compressed) < len(content) * 0.9:
+            with open(self.path(f'{name}.gz'), 'wb') as target:
+                target.write(compressed)
@@ -0,0 +1,28 @@
+from functools import cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+register = template.Library()
+
+# Куда команда vendor_bootstrap кладёт стили Bootstrap.
+VENDORED_BOOTSTRAP_CSS = 'vendor/bootstrap/bootstrap.min.css'
+
+
+@cache
+def is_vendored(name):
+    return finders.find(name) is not None
+
+
+@register.simple_tag
+def bootstrap_stylesheet():
+    """Стили Bootstrap из своей статики, а если их нет — с CDN."""
+    if is_vendored(VENDORED_BOOTSTRAP_CSS):
+        return format_html(
+            '<link rel="stylesheet" href="{}">',
+            static(VENDORED_BOOTSTRAP_CSS)
+        )
+    return bootstrap_css()
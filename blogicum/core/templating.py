@@ -0,0 +1,30 @@
+"""Предварительная компиляция шаблонов проекта.
+
+С кэширующим загрузчиком скомпилированный шаблон живёт до перезапуска
+процесса, поэтому прогрев при старте убирает разбор шаблонов с первых
+запросов, а та же компиляция в системной проверке ловит ошибки в
+шаблонах до выкладки.
+"""
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+
+def project_template_names():
+    """Имена всех шаблонов из каталога шаблонов проекта."""
+    root = settings.TEMPLATES_DIR
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in root.rglob('*') if path.is_file()
+    )
+
+
+def warm_templates():
+    """Компилирует шаблоны проекта; возвращает список (имя, ошибка)."""
+    engine = engines['django']
+    errors = []
+    for name in project_template_names():
+        try:
+            engine.get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError) as error:
+            errors.append((name, error))
+    return errors
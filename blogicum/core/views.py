@@ -1,16 +1,21 @@
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 
+from . import metrics
 
-# Обработчик ошибки CSRF
-def csrf_failure(request, reason=''):
-    return render(request, 'pages/403csrf.html', status=403)
 
-
-# Обработчик ошибки 404
-def page_not_found(request, exception):
-    return render(request, 'pages/404.html', status=404)
-
-
-# Обработчик ошибки 500
-def server_error(request):
-    return render(request, 'pages/500.html', status=500)
+@staff_member_required
+def metrics_view(request):
+    """Счётчики текущего воркера с производными значениями."""
+    data = metrics.snapshot()
+    for names in data.values():
+        for counters in names.values():
+            if counters.get('bytes_out'):
+                counters['ratio'] = (
+                    counters['bytes_in'] / counters['bytes_out']
+                )
+            if 'seconds' in counters:
+                counters['avg_ms'] = (
+                    counters['seconds'] * 1000 / counters['count']
+                )
+    return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
@@ -1,5 +1,9 @@
-from django.views.generic import TemplateView
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
 from django.shortcuts import render
+from django.views.generic import TemplateView
+
+from core import metrics, prerender
 
 
 class About(TemplateView):
@@ -10,16 +14,32 @@ class Rules(TemplateView):
     template_name = 'pages/rules.html'
 
 
+def render_error(request, key, template_name, status):
+    """Страница ошибки без запросов к БД.
+
+    Отдаётся вариант для гостя: при всплеске ошибок страница не должна
+    читать сессию и пользователя. Готовое тело берётся из хранилища
+    prerender, а если его там нет — шаблон рендерится для гостя.
+    """
+    metrics.record('errors', str(status))
+    body = prerender.get(key, request, personal=False)
+    if body is not None:
+        return HttpResponse(body, status=status)
+    return render(
+        request, template_name, {'user': AnonymousUser()}, status=status
+    )
+
+
 # Обработчик ошибки 500
 def server_error(request):
-    return render(request, 'pages/500.html', status=500)
+    return render_error(request, '500', 'pages/500.html', 500)
 
 
 # Обработчик ошибки 404
 def page_not_found(request, exception):
-    return render(request, 'pages/404.html', status=404)
+    return render_error(request, '404', 'pages/404.html', 404)
 
 
 # Обработчик ошибки CSRF
-def csrf_failure(request, reason=""):
-    return render(request, 'pages/403csrf.html', status=403)
+def csrf_failure(request, reason=''):
+    return render_error(request, '403csrf', 'pages/403csrf.html', 403)
@@ -0,0 +1,22 @@
+from unittest import mock
+
+import pytest
+
+from blog import admin
+from blog.models import Location
+
+
+@pytest.mark.django_db
+def test_count_not_overstated_after_deletion(mixer):
+    mixer.cycle(12).blend("blog.Location")
+    Location.objects.filter(
+        pk__in=list(Location.objects.values_list("pk", flat=True)[4:])
+    ).delete()
+    with mock.patch.object(admin, "ESTIMATE_COUNT_THRESHOLD", 3):
+        paginator = admin.EstimatedCountPaginator(
+            Location.objects.order_by("pk"), 2
+        )
+        assert paginator.count == 4, (
+            "Убедитесь, что после удаления строк число страниц не"
+            " оценивается по наибольшему первичному ключу."
+        )
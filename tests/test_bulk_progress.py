@@ -0,0 +1,121 @@
+import threading
+import time
+from http import HTTPStatus
+
+import pytest
+from django.contrib.admin import helpers
+from django.core.cache import cache
+
+from blog import bulk
+from blog.models import AuthorStats, Post
+
+
+def test_task_without_heartbeat_shown_stalled():
+    state = {"label": "Удаление", "total": 10, "done": 2,
+             "status": "running", "updated_at": time.time()}
+    cache.set(bulk.progress_key("task"), state)
+    assert bulk.get_progress("task")["status"] == "running"
+    state["updated_at"] -= bulk.STALE_AFTER + 1
+    cache.set(bulk.progress_key("task"), state)
+    assert bulk.get_progress("task")["status"] == "stalled", (
+        "Убедитесь, что задача, переставшая обновлять ход выполнения,"
+        " не показывается выполняющейся бесконечно."
+    )
+    cache.delete(bulk.progress_key("task"))
+
+
+def run_action(admin_client, action, pks, **extra):
+    return admin_client.post("/admin/blog/post/", {
+        "action": action,
+        helpers.ACTION_CHECKBOX_NAME: [str(pk) for pk in pks],
+        **extra,
+    })
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+
+
+@pytest.mark.django_db
+def test_publish_actions_update_rows(admin_client, posts):
+    pks = [post.pk for post in posts[:2]]
+    run_action(admin_client, "unpublish", pks)
+    assert set(Post.objects.filter(is_published=False).values_list(
+        "pk", flat=True
+    )) == set(pks), "Убедитесь, что действие снимает с публикации выбранное."
+    assert not Post.objects.filter(pk__in=pks, is_visible=True).exists()
+    assert AuthorStats.objects.get(author=posts[0].author).published_count == (
+        len(posts) - len(pks)
+    ), "Убедитесь, что массовое действие обновляет статистику автора."
+    run_action(admin_client, "publish", pks)
+    assert Post.objects.filter(is_published=True).count() == len(posts), (
+        "Убедитесь, что действие публикует выбранные посты."
+    )
+
+
+@pytest.mark.django_db
+def test_move_to_category_asks_for_category(
+    admin_client, posts, another_category
+):
+    pks = [post.pk for post in posts]
+    response = run_action(admin_client, "move_to_category", pks)
+    assert response.status_code == HTTPStatus.OK
+    assert not Post.objects.filter(category=another_category).exists()
+    run_action(
+        admin_client, "move_to_category", pks,
+        apply="1", category=another_category.pk,
+    )
+    assert Post.objects.filter(category=another_category).count() == len(
+        pks
+    ), "Убедитесь, что действие переносит посты в выбранную категорию."
+
+
+@pytest.mark.django_db
+def test_delete_in_batches_after_confirmation(admin_client, posts):
+    pks = [post.pk for post in posts[:2]]
+    run_action(admin_client, "delete_in_batches", pks)
+    assert Post.objects.count() == len(posts), (
+        "Убедитесь, что удаление ждёт подтверждения."
+    )
+    run_action(admin_client, "delete_in_batches", pks, apply="1")
+    assert list(Post.objects.values_list("pk", flat=True)) == [
+        posts[2].pk
+    ], "Убедитесь, что удаляются только выбранные посты."
+
+
+@pytest.mark.django_db(transaction=True)
+def test_large_selection_runs_in_background(admin_client, posts, monkeypatch):
+    monkeypatch.setattr(bulk, "BACKGROUND_THRESHOLD", 2)
+    monkeypatch.setattr(bulk, "BATCH_SIZE", 2)
+    threads = []
+
+    class RecordingThread(threading.Thread):
+        def start(self):
+            threads.append(self)
+            super().start()
+
+    monkeypatch.setattr(bulk.threading, "Thread", RecordingThread)
+    response = run_action(
+        admin_client, "unpublish", [post.pk for post in posts]
+    )
+    assert response.status_code == HTTPStatus.FOUND, (
+        "Убедитесь, что большая выборка перенаправляет на страницу хода"
+        " выполнения."
+    )
+    for thread in threads:
+        thread.join(timeout=10)
+    progress_url = response["Location"]
+    task_id = progress_url.rstrip("/").rsplit("/", 1)[-1]
+    state = bulk.get_progress(task_id)
+    assert state["status"] == "done"
+    assert state["done"] == state["total"] == len(posts)
+    assert not Post.objects.filter(is_published=True).exists(), (
+        "Убедитесь, что фоновая операция применяется ко всем постам."
+    )
+    response = admin_client.get(progress_url)
+    assert response.status_code == HTTPStatus.OK
+    cache.delete(bulk.progress_key(task_id))
@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import Client
+
+from blog.models import Change, Post
+
+
+@pytest.fixture
+def staff_client(mixer):
+    client = Client()
+    client.force_login(mixer.blend("auth.User", is_staff=True))
+    return client
+
+
+@pytest.mark.django_db
+def test_change_feed(staff_client, user_client, post_with_published_location):
+    post = post_with_published_location
+    response = user_client.get("/changes/")
+    assert response.status_code == HTTPStatus.FORBIDDEN, (
+        "Убедитесь, что журнал изменений доступен только персоналу."
+    )
+
+    changes = staff_client.get("/changes/").json()
+    assert {"model": "blog.post", "id": post.id, "action": "save"} in [
+        {key: change[key] for key in ("model", "id", "action")}
+        for change in changes["changes"]
+    ], "Убедитесь, что сохранение поста попадает в журнал изменений."
+
+    since, post_id = changes["next"], post.id
+    post.delete()
+    changes = staff_client.get(f"/changes/?since={since}").json()
+    assert [
+        (change["model"], change["id"], change["action"])
+        for change in changes["changes"]
+    ] == [("blog.post", post_id, "delete")], (
+        "Убедитесь, что журнал отдаёт только изменения после `since`."
+    )
+
+
+@pytest.mark.django_db
+def test_category_cascade_logged(mixer, published_category):
+    post = mixer.blend("blog.Post", category=published_category)
+    other = mixer.blend("blog.Post", category=published_category)
+    assert Post.objects.get(pk=post.pk).is_visible
+    since = Change.objects.order_by("-seq").values_list("seq", flat=True)[0]
+
+    published_category.is_published = False
+    published_category.save()
+    logged = set(Change.objects.filter(
+        seq__gt=since, model="blog.post"
+    ).values_list("object_id", flat=True))
+    assert logged == {post.pk, other.pk}, (
+        "Убедитесь, что скрытие постов вместе с категорией попадает"
+        " в журнал изменений."
+    )
+    assert not Post.objects.filter(is_visible=True).exists()
+    assert Post.objects.get(pk=post.pk).updated_at > post.updated_at
+
+    published_category.is_published = True
+    published_category.save()
+    since = Change.objects.order_by("-seq").values_list("seq", flat=True)[0]
+    published_category.delete()
+    assert set(Change.objects.filter(
+        seq__gt=since, model="blog.post"
+    ).values_list("object_id", flat=True)) == {post.pk, other.pk}
+    assert not Post.objects.filter(is_visible=True).exists()
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+
+from blog import comment_queue
+from blog.models import Comment
+
+
+@pytest.mark.django_db
+def test_queued_comment_pending_then_flushed(
+        user_client, another_user_client, mixer, user, published_category,
+        settings, tmp_path
+):
+    settings.COMMENT_QUEUE = True
+    settings.COMMENT_QUEUE_ROOT = tmp_path
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    url = f"/posts/{post.id}/"
+    user_client.post(f"{url}comment/", data={"text": "Из очереди"})
+    assert not post.comments.exists()
+    assert "Из очереди" in user_client.get(url).content.decode(), (
+        "Убедитесь, что автор сразу видит свой комментарий из очереди."
+    )
+    assert "Из очереди" not in another_user_client.get(url).content.decode()
+
+    entry, = comment_queue.pending(post.id, user.id)
+    call_command("flush_comments")
+    comment, = post.comments.all()
+    assert comment.text == "Из очереди"
+    assert comment_queue.pending(post.id, user.id) == []
+
+    # Файл, прерванный после коммита, не даёт дубликатов.
+    with open(os.path.join(tmp_path, "claimed-0.jsonl"), "w") as claimed:
+        claimed.write(json.dumps(entry) + "\n")
+    assert comment_queue.flush() == 0
+    assert post.comments.count() == 1
+
+
+def test_pending_reads_only_its_own_index(settings, tmp_path, monkeypatch):
+    settings.COMMENT_QUEUE_ROOT = tmp_path
+    comment_queue.enqueue(1, 1, "Первый пост")
+    comment_queue.enqueue(2, 1, "Второй пост")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Страница поста не должна ждать блокировку.")
+
+    monkeypatch.setattr(comment_queue, "locked", fail)
+    monkeypatch.setattr(comment_queue, "read_entries", mock.Mock(
+        wraps=comment_queue.read_entries
+    ))
+    entry, = comment_queue.pending(2, 1)
+    assert entry["text"] == "Второй пост"
+    comment_queue.read_entries.assert_called_once_with(
+        comment_queue.pending_path(2, 1)
+    )
+
+
+@pytest.mark.django_db
+def test_queue_checks_post_before_enqueue(
+        user_client, user, another_user, mixer, published_category,
+        settings, tmp_path
+):
+    settings.COMMENT_QUEUE = True
+    settings.COMMENT_QUEUE_ROOT = tmp_path
+    hidden = mixer.blend(
+        "blog.Post", author=another_user, category=published_category,
+        is_published=False,
+    )
+    post, other = mixer.cycle(2).blend(
+        "blog.Post", author=another_user, category=published_category
+    )
+    foreign = mixer.blend("blog.Comment", post=other, author=another_user)
+    for url, data in (
+        (f"/posts/{hidden.id}/comment/", {"text": "Скрытый"}),
+        (f"/posts/{post.id}/comment/",
+         {"text": "Чужой", "parent": foreign.id}),
+    ):
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            "Убедитесь, что очередь не принимает комментарии к недоступным"
+            " постам и ответы на комментарии из других постов."
+        )
+    assert comment_queue.pending(hidden.id, user.id) == []
+    assert comment_queue.pending(post.id, user.id) == []
+
+
+@pytest.mark.django_db
+def test_flush_keeps_dates_and_logs_discarded(
+        user, mixer, published_category, settings, tmp_path, caplog
+):
+    settings.COMMENT_QUEUE_ROOT = tmp_path
+    post, other = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    foreign = mixer.blend("blog.Comment", post=other, author=user)
+    kept = comment_queue.enqueue(post.id, user.id, "Принят")
+    comment_queue.enqueue(post.id, user.id, "Ответ не туда", foreign.id)
+    comment_queue.enqueue(post.id + 100, user.id, "К удалённому посту")
+    with caplog.at_level(logging.WARNING, logger="blog.comment_queue"):
+        assert comment_queue.flush() == 1
+    assert len(caplog.records) == 2, (
+        "Убедитесь, что отброшенные при записи комментарии попадают в лог."
+    )
+    comment = post.comments.get()
+    assert comment.created_at == parse_datetime(kept["created_at"]), (
+        "Убедитесь, что комментарий из очереди сохраняет время отправки."
+    )
+    assert Comment._meta.get_field("created_at").auto_now_add
@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_replies_follow_their_thread(
+        user_client, mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    other_post = mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+    url = f"/posts/{post.id}/comment/"
+    user_client.post(url, data={"text": "Первый"})
+    first = post.comments.get()
+    user_client.post(url, data={"text": "Второй"})
+    user_client.post(url, data={"text": "Ответ", "parent": first.id})
+    reply = post.comments.get(text="Ответ")
+    assert reply.parent == first
+    assert reply.path.startswith(first.path) and reply.depth == 1
+
+    comments = user_client.get(f"/posts/{post.id}/").context["comments"]
+    assert [comment.text for comment in comments] == [
+        "Первый", "Ответ", "Второй"
+    ], "Убедитесь, что ответы выводятся сразу под своим комментарием."
+
+    response = user_client.post(
+        f"/posts/{other_post.id}/comment/",
+        data={"text": "Чужая ветка", "parent": first.id},
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_replies_survive_parent_deletion(
+        user_client, another_user, mixer, user, published_category
+):
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    parent = mixer.blend("blog.Comment", post=post, author=user)
+    reply = mixer.blend(
+        "blog.Comment", post=post, author=another_user, parent=parent
+    )
+    user_client.post(
+        f"/posts/{post.id}/comment/{parent.id}/delete_comment/"
+    )
+    assert not post.comments.filter(pk=parent.pk).exists()
+    reply.refresh_from_db()
+    assert reply.parent is None, (
+        "Убедитесь, что удаление комментария не удаляет ответы на него."
+    )
+    comments = user_client.get(f"/posts/{post.id}/").context["comments"]
+    assert list(comments) == [reply]
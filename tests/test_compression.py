@@ -0,0 +1,25 @@
+from http import HTTPStatus
+
+import pytest
+
+from core import metrics
+
+
+@pytest.mark.django_db
+def test_feed_page_is_compressed(
+        client, admin_client, many_posts_with_published_locations
+):
+    metrics.reset()
+    plain = client.get("/")
+    assert "Content-Encoding" not in plain
+
+    response = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip", (
+        "Убедитесь, что HTML-страницы сжимаются для клиентов с поддержкой"
+        " gzip."
+    )
+    assert len(response.content) * 3 < len(plain.content)
+
+    assert client.get("/metrics/").status_code == HTTPStatus.FOUND
+    data = admin_client.get("/metrics/").json()
+    assert data["compression"]["blog:index"]["ratio"] > 3
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_conditional_get(
+        client, post_with_published_location, mixer, CommentModel
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    etags = {}
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+        )
+        etags[url] = response["ETag"]
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отдаёт 304."
+        )
+
+    mixer.blend(f"blog.{CommentModel.__name__}", post=post)
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что после нового комментария страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+@pytest.mark.django_db
+def test_conditional_get_after_bulk_update(
+        client, post_with_published_location, PostModel
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    etag = client.get(url)["ETag"]
+    old_updated_at = post.updated_at
+    PostModel.objects.filter(pk=post.pk).update(title="Новый заголовок")
+    post.refresh_from_db()
+    assert post.updated_at > old_updated_at, (
+        "Убедитесь, что массовое обновление постов меняет `updated_at`."
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после правки поста его страница отдаётся заново."
+    )
+
+
+@pytest.mark.django_db
+def test_deleted_comment_not_served_from_if_modified_since(
+        client, post_with_published_location, mixer, CommentModel
+):
+    post = post_with_published_location
+    comment = mixer.blend(f"blog.{CommentModel.__name__}", post=post)
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    assert not response.has_header("Last-Modified")
+    comment.delete()
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после удаления комментария страница поста"
+        " не отдаётся как неизменившаяся."
+    )
+
+
+@pytest.mark.django_db
+def test_not_modified_costs_one_query(
+        client, many_posts_with_published_locations, django_assert_num_queries
+):
+    etag = client.get("/")["ETag"]
+    with django_assert_num_queries(1):
+        response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что ответ 304 на ленту стоит одного лёгкого запроса."
+    )
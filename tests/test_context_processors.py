@@ -0,0 +1,46 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import checks, metrics
+
+
+@pytest.mark.django_db
+def test_anonymous_feed_skips_session_and_user(
+        client, many_posts_with_published_locations
+):
+    metrics.reset()
+    client.cookies["csrftoken"] = "x" * 32
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert response.context["user"].is_anonymous
+    sql = " ".join(query["sql"] for query in queries.captured_queries)
+    assert "django_session" not in sql, (
+        "Убедитесь, что лента для гостя не читает сессию."
+    )
+    assert 'FROM "auth_user"' not in sql
+    assert "core.context_processors.auth" in (
+        metrics.snapshot()["context_processors"]
+    )
+
+
+@pytest.mark.django_db
+def test_logged_in_user_in_context(user_client, user):
+    response = user_client.get("/")
+    assert response.context["user"] == user
+
+
+def test_admin_context_processors_checked():
+    assert not checks.check_admin_context_processors(None), (
+        "Убедитесь, что замены контекст-процессоров устраивают админку."
+    )
+    with override_settings(CONTEXT_PROCESSORS=[
+        "django.template.context_processors.request",
+        "core.context_processors.auth",
+    ]):
+        errors = checks.check_admin_context_processors(None)
+    assert [error.id for error in errors] == ["core.E003"], (
+        "Убедитесь, что без процессора сообщений проверка сообщает об"
+        " ошибке."
+    )
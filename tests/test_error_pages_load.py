@@ -0,0 +1,28 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from core import metrics
+
+
+@pytest.mark.django_db
+def test_404_without_db_and_throttled(
+        client, settings, django_assert_num_queries
+):
+    cache.clear()
+    metrics.reset()
+    settings.NOT_FOUND_LIMIT = 3
+    for _ in range(3):
+        with django_assert_num_queries(0):
+            response = client.get("/no-such-page/")
+        assert response.status_code == HTTPStatus.NOT_FOUND
+    response = client.get("/")
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+        "Убедитесь, что IP с частыми ответами 404 получает ответ 429."
+    )
+    assert response["Retry-After"]
+    counters = metrics.snapshot()["errors"]
+    assert counters["404"]["count"] == 3
+    assert counters["404-throttled"]["count"] == 1
+    cache.clear()
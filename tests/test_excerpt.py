@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_excerpt_stored_and_text_deferred(
+        client, many_posts_with_published_locations
+):
+    post_model = type(many_posts_with_published_locations[0])
+    post = post_model.objects.order_by("-pub_date").first()
+    post_model.objects.filter(pk=post.pk).update(
+        text=" ".join(f"слово{i}" for i in range(30))
+    )
+    post.refresh_from_db()
+    assert post.excerpt == " ".join(f"слово{i}" for i in range(10)) + " …"
+
+    response = client.get("/")
+    card = next(p for p in response.context["page_obj"] if p.pk == post.pk)
+    assert "text" in card.get_deferred_fields(), (
+        "Убедитесь, что лента не загружает полный текст постов."
+    )
+    assert post.excerpt in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_detail_loads_full_text(client, many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    response = client.get(f"/posts/{post.pk}/")
+    assert not response.context["post"].get_deferred_fields() & {
+        "text", "title", "pub_date"
+    }
+    author = response.context["post"].author
+    assert "password" in author.get_deferred_fields(), (
+        "Убедитесь, что страница поста не загружает лишние поля автора."
+    )
@@ -0,0 +1,133 @@
+import io
+import json
+from unittest import mock
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.core.serializers.json import DjangoJSONEncoder
+
+from blog import exchange
+from blog.models import Category, Comment, Location, Post
+
+
+@pytest.fixture
+def blog_data(mixer, user, published_category, published_location):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location,
+    )
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    root = Comment.objects.create(post=post, author=user, text="Корень")
+    Comment.objects.create(post=post, author=user, text="Ответ", parent=root)
+    return post
+
+
+def snapshot():
+    # Даты в том виде, в каком их хранит файл выгрузки (до миллисекунд).
+    return json.loads(json.dumps({
+        "posts": sorted(Post.objects.values_list(
+            "pk", "title", "author__username", "category__slug",
+            "location_id", "is_visible", "excerpt", "created_at",
+            "updated_at",
+        )),
+        "comments": sorted(Comment.objects.values_list(
+            "pk", "post_id", "parent_id", "path", "text", "created_at",
+            "updated_at",
+        )),
+        "categories": sorted(Category.objects.values_list(
+            "slug", "title", "created_at", "updated_at"
+        )),
+        "locations": sorted(Location.objects.values_list("pk", "name")),
+    }, cls=DjangoJSONEncoder))
+
+
+def clear_blog():
+    Comment.objects.all().delete()
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    Location.objects.all().delete()
+
+
+@pytest.mark.django_db
+def test_export_import_round_trip(blog_data, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", str(path))
+    before = snapshot()
+    clear_blog()
+    call_command("import_blog", str(path), "--batch-size", "2")
+    assert snapshot() == before, (
+        "Убедитесь, что импорт выгрузки восстанавливает посты,"
+        " комментарии, категории и местоположения."
+    )
+    assert not (tmp_path / "blog.jsonl.progress").exists()
+
+
+@pytest.mark.django_db
+def test_import_resumes_after_interruption(blog_data, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", str(path))
+    before = snapshot()
+    clear_blog()
+
+    real_import = exchange.import_batch
+    calls = []
+
+    def interrupted(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return real_import(*args, **kwargs)
+
+    with mock.patch(
+        "blog.management.commands.import_blog.import_batch", interrupted
+    ), pytest.raises(KeyboardInterrupt):
+        call_command("import_blog", str(path), "--batch-size", "2")
+    progress = tmp_path / "blog.jsonl.progress"
+    assert progress.exists()
+
+    with mock.patch(
+        "blog.management.commands.import_blog.import_batch",
+        wraps=real_import,
+    ) as resumed:
+        call_command(
+            "import_blog", str(path), "--batch-size", "2", "--resume"
+        )
+    first = resumed.call_args_list[0].args
+    assert (first[0], [r["pk"] for r in first[1]]) == (
+        calls[-1][0], [r["pk"] for r in calls[-1][1]]
+    ), (
+        "Убедитесь, что импорт с --resume начинается с прерванной порции."
+    )
+    assert not progress.exists()
+    assert snapshot() == before, (
+        "Убедитесь, что импорт с --resume загружает оставшиеся строки."
+    )
+
+
+@pytest.mark.django_db
+def test_import_reports_missing_natural_keys(user, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    record = {
+        "model": "blog.post",
+        "fields": {
+            "pk": 1, "title": "Пост", "text": "Текст",
+            "pub_date": "2020-01-01T00:00:00Z", "image": "",
+            "location_id": None, "is_published": True,
+            "created_at": "2020-01-01T00:00:00Z",
+            "updated_at": "2020-01-01T00:00:00Z",
+            "author": user.username, "category": "no-such-category",
+        },
+    }
+    path.write_text(json.dumps(record) + "\n", encoding="utf-8")
+    with pytest.raises(CommandError, match="no-such-category"):
+        call_command("import_blog", str(path))
+    assert not Post.objects.exists()
+
+    out = io.StringIO()
+    call_command("import_blog", str(path), "--skip-missing", stdout=out)
+    assert not Post.objects.exists()
+    assert "blog.post: пропущено" in out.getvalue(), (
+        "Убедитесь, что import_blog сообщает о пропущенных записях."
+    )
@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_feeds(client, mixer, post_with_published_location):
+    post = post_with_published_location
+    urls = (
+        "/feeds/rss/",
+        "/feeds/atom/",
+        f"/feeds/category/{post.category.slug}/rss/",
+        f"/feeds/category/{post.category.slug}/atom/",
+        f"/feeds/author/{post.author.username}/rss/",
+        f"/feeds/author/{post.author.username}/atom/",
+    )
+    etags = {}
+    for url in urls:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что лента `{url}` отображается без ошибок."
+        )
+        assert post.title in response.content.decode(), (
+            f"Убедитесь, что опубликованный пост попадает в ленту `{url}`."
+        )
+        etags[url] = response["ETag"]
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся лента `{url}` отдаёт 304."
+        )
+
+    post.title = "Обновлённый заголовок"
+    post.save()
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.OK
+        assert post.title in response.content.decode(), (
+            f"Убедитесь, что после правки поста лента `{url}` обновляется."
+        )
+
+
+@pytest.mark.django_db
+def test_feed_of_unpublished_category(client, posts_with_unpublished_category):
+    slug = posts_with_unpublished_category[0].category.slug
+    response = client.get(f"/feeds/category/{slug}/rss/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_feed_cache_ignores_query_string(
+    client, django_assert_num_queries, post_with_published_location
+):
+    client.get("/feeds/rss/")
+    with django_assert_num_queries(0):
+        response = client.get("/feeds/rss/?utm_source=mail")
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что лента с параметрами запроса берётся из кэша."
+    )
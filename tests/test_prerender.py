@@ -0,0 +1,33 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def prerendered(settings, tmp_path):
+    settings.PRERENDER_ROOT = tmp_path
+    call_command("prerender_pages")
+    settings.PRERENDER_PAGES = True
+
+
+@pytest.mark.django_db
+def test_static_pages_served_prerendered(
+        client, user_client, user, prerendered
+):
+    response = client.get("/pages/about/")
+    assert not response.templates, (
+        "Убедитесь, что статичные страницы отдаются без рендеринга шаблонов."
+    )
+    assert "Войти" in response.content.decode()
+
+    content = user_client.get("/pages/rules/").content.decode()
+    assert f"/profile/{user.username}/" in content, (
+        "Убедитесь, что вошедший пользователь видит свою шапку страницы."
+    )
+
+
+@pytest.mark.django_db
+def test_error_page_served_prerendered(client, prerendered):
+    response = client.get("/no-such-page/")
+    assert response.status_code == 404
+    assert not response.templates
+    assert "/no-such-page/" in response.content.decode()
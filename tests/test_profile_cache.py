@@ -0,0 +1,187 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import bulk
+from blog.models import AuthorStats, Post
+
+
+@pytest.mark.django_db
+def test_profile_cache_invalidated_on_edit(
+        client, user_client, user, django_assert_max_num_queries
+):
+    url = f"/profile/{user.username}/"
+    assert client.get(url).status_code == HTTPStatus.OK
+    with django_assert_max_num_queries(3):
+        # Валидаторы условного GET, число постов и страница постов;
+        # сам автор берётся из кэша.
+        response = client.get(url)
+    assert response.context["profile"] == user
+
+    response = user_client.post(
+        "/profile/edit/",
+        data={
+            "first_name": "Новое",
+            "last_name": "Имя",
+            "username": user.username,
+            "email": "new@example.com",
+        },
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    response = client.get(url)
+    assert "Новое Имя" in response.content.decode(), (
+        "Убедитесь, что после редактирования профиля страница пользователя"
+        " показывает новые данные."
+    )
+
+
+@pytest.mark.django_db
+def test_author_stats(
+        client, user, many_posts_with_published_locations, mixer,
+        CommentModel, django_capture_on_commit_callbacks
+):
+    post = many_posts_with_published_locations[0]
+    mixer.cycle(2).blend(
+        f"blog.{CommentModel.__name__}", post=post, author=user
+    )
+    stats = client.get(f"/profile/{user.username}/").context["stats"]
+    assert stats.post_count == len(many_posts_with_published_locations)
+    assert stats.comment_count == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    stats.refresh_from_db()
+    assert stats.post_count == len(many_posts_with_published_locations) - 1
+    assert stats.comment_count == 0, (
+        "Убедитесь, что статистика автора пересчитывается при удалении"
+        " поста вместе с комментариями."
+    )
+
+
+@pytest.mark.django_db
+def test_author_stats_count_visible_posts_only(
+        client, user, mixer, published_category
+):
+    visible = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(days=30),
+    )
+    stats = client.get(f"/profile/{user.username}/").context["stats"]
+    assert stats.published_count == 1, (
+        "Убедитесь, что гостям не считаются отложенные публикации."
+    )
+    assert stats.last_post_date == visible.pub_date
+    assert stats.post_count == 2
+
+
+@pytest.mark.django_db
+def test_profile_etag_changes_with_own_comments(
+        client, user, another_user, mixer, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=another_user, category=published_category
+    )
+    url = f"/profile/{user.username}/"
+    etag = client.get(url)["ETag"]
+    mixer.blend("blog.Comment", post=post, author=user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что комментарий автора к чужому посту меняет ETag"
+        " его профиля."
+    )
+    assert response.context["stats"].comment_count == 1
+
+
+@pytest.mark.django_db
+def test_author_stats_refreshed_once_per_deletion_batch(
+        user, mixer, published_category, django_capture_on_commit_callbacks
+):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    mixer.cycle(5).blend("blog.Comment", post=posts[0], author=user)
+    with CaptureQueriesContext(connection) as queries, (
+        django_capture_on_commit_callbacks(execute=True)
+    ):
+        bulk.run_in_batches(
+            [post.pk for post in posts], bulk.delete_objects(Post)
+        )
+    refreshes = [
+        query for query in queries.captured_queries
+        if query["sql"].startswith('UPDATE "blog_authorstats"')
+    ]
+    assert len(refreshes) == 1, (
+        "Убедитесь, что статистика автора пересчитывается один раз"
+        " на порцию удаления."
+    )
+    assert not Post.objects.exists()
+
+
+def stats_row(author):
+    return AuthorStats.objects.filter(author=author).values(
+        "post_count", "published_count", "comment_count", "last_post_date"
+    ).first()
+
+
+@pytest.mark.django_db
+def test_author_stats_follow_reassigned_post(
+        user, another_user, mixer, published_category
+):
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=mixer.sequence(
+            *(timezone.now() - timedelta(days=n) for n in (1, 2))
+        ),
+    )
+    mixer.blend("blog.Post", author=another_user,
+                category=published_category)
+    post = Post.objects.get(pk=posts[0].pk)
+    post.author = another_user
+    post.save()
+    expected = {author: stats_row(author) for author in (user, another_user)}
+    AuthorStats.refresh([user.pk, another_user.pk])
+    for author, row in expected.items():
+        assert row == stats_row(author), (
+            "Убедитесь, что при смене автора поста статистика обновляется"
+            " у обоих авторов."
+        )
+    assert expected[user]["post_count"] == 1
+    assert expected[user]["last_post_date"] == posts[1].pub_date
+
+
+@pytest.mark.django_db
+def test_author_stats_updated_without_recount(
+        user, mixer, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category
+    )
+    with CaptureQueriesContext(connection) as queries:
+        post.title = "Новый заголовок"
+        post.save()
+        mixer.blend("blog.Comment", post=post, author=user)
+    recounts = [
+        query for query in queries.captured_queries
+        if query["sql"].startswith('UPDATE "blog_authorstats"')
+        and '"blog_post"' in query["sql"]
+    ]
+    assert not recounts, (
+        "Убедитесь, что правка поста и новый комментарий не пересчитывают"
+        " статистику автора заново."
+    )
+    post.is_published = False
+    post.save()
+    row = stats_row(user)
+    AuthorStats.refresh([user.pk])
+    assert row == stats_row(user) == {
+        "post_count": 1, "published_count": 0, "comment_count": 1,
+        "last_post_date": None,
+    }, "Убедитесь, что снятие поста с публикации меняет статистику автора."
@@ -0,0 +1,60 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from core import ratelimit
+
+
+@pytest.mark.django_db
+def test_comment_flood_limited(user_client, another_user_client, mixer,
+                               user, published_category, settings):
+    cache.clear()
+    settings.RATE_LIMITS = {"blog:add_comment": {"user": (2, 60)}}
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    url = f"/posts/{post.id}/comment/"
+    for _ in range(2):
+        response = user_client.post(url, data={"text": "Текст"})
+        assert response.status_code == HTTPStatus.FOUND
+    response = user_client.post(url, data={"text": "Текст"})
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+        "Убедитесь, что частые комментарии одного пользователя"
+        " отклоняются с кодом 429."
+    )
+    assert 0 < int(response["Retry-After"]) <= 30
+    assert post.comments.count() == 2
+    response = another_user_client.post(url, data={"text": "Текст"})
+    assert response.status_code == HTTPStatus.FOUND, (
+        "Убедитесь, что лимит считается отдельно для каждого пользователя."
+    )
+    cache.clear()
+
+
+def test_bucket_refills_and_survives_cache_outage():
+    cache.clear()
+    assert ratelimit.take("test", 1, 10, now=100) == 0
+    assert ratelimit.take("test", 1, 10, now=101) == 9
+    assert ratelimit.take("test", 1, 10, now=110) == 0
+    with mock.patch.object(ratelimit, "cache") as broken:
+        broken.get.side_effect = broken.set.side_effect = ConnectionError
+        assert ratelimit.take("outage", 1, 10, now=100) == 0
+        assert ratelimit.take("outage", 1, 10, now=101) == 9
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_refused_user_keeps_ip_tokens(rf, user, settings):
+    cache.clear()
+    settings.RATE_LIMITS = {"scope": {"user": (1, 60), "ip": (2, 60)}}
+    request = rf.post("/")
+    request.user = user
+    assert ratelimit.check(request, "scope") == 0
+    for _ in range(3):
+        assert ratelimit.check(request, "scope") > 0
+    guest = rf.post("/")
+    assert ratelimit.check(guest, "scope") == 0, (
+        "Убедитесь, что запрос, отклонённый по лимиту пользователя,"
+        " не тратит токены лимита по IP."
+    )
+    cache.clear()
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_category_toggle_updates_registry(
+        client, published_category, many_posts_with_published_locations
+):
+    url = f"/category/{published_category.slug}/"
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    post = response.context["page_obj"][0]
+    assert post.category == published_category
+    assert post.location is not None
+
+    published_category.is_published = False
+    published_category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что снятая с публикации категория сразу перестаёт"
+        " открываться."
+    )
+    assert not client.get("/").context["page_obj"].object_list, (
+        "Убедитесь, что посты снятой с публикации категории сразу пропадают"
+        " с главной страницы."
+    )
+
+
+@pytest.mark.django_db
+def test_category_bulk_update_cascades(
+        client, published_category, many_posts_with_published_locations
+):
+    category_model = type(published_category)
+    category_model.objects.filter(pk=published_category.pk).update(
+        is_published=False
+    )
+    post = many_posts_with_published_locations[0]
+    post.refresh_from_db()
+    assert not post.is_visible, (
+        "Убедитесь, что снятие категории с публикации массовым update()"
+        " скрывает её посты."
+    )
+    category_model.objects.filter(pk=published_category.pk).update(
+        is_published=True
+    )
+    assert len(client.get("/").context["page_obj"].object_list) == 10
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+
+@pytest.mark.django_db
+def test_publish_due(client, mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert post not in client.get("/").context["page_obj"].object_list
+    # Кэш ленты уже заполнен и должен сброситься при выходе поста.
+    client.get("/feeds/rss/")
+
+    published = type(post).objects.publish_due(
+        now=post.pub_date + timedelta(seconds=1)
+    )
+    assert published == 1
+    assert post in client.get("/").context["page_obj"].object_list, (
+        "Убедитесь, что отложенный пост появляется на главной странице"
+        " после запуска планировщика."
+    )
+    assert post.title in client.get("/feeds/rss/").content.decode(), (
+        "Убедитесь, что выход отложенного поста сбрасывает кэш лент."
+    )
@@ -0,0 +1,72 @@
+import runpy
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+SETTINGS_PATH = Path(settings.BASE_DIR) / "blogicum" / "settings.py"
+
+
+@pytest.mark.parametrize("storage", ["cached_db", "signed_cookies", "db"])
+def test_session_engine_follows_storage(monkeypatch, storage):
+    monkeypatch.setenv("BLOGICUM_SESSION_STORAGE", storage)
+    engine = runpy.run_path(str(SETTINGS_PATH))["SESSION_ENGINE"]
+    assert engine == f"django.contrib.sessions.backends.{storage}", (
+        "Убедитесь, что BLOGICUM_SESSION_STORAGE выбирает движок сессий."
+    )
+
+
+def test_unknown_session_storage_rejected(monkeypatch):
+    monkeypatch.setenv("BLOGICUM_SESSION_STORAGE", "redis")
+    with pytest.raises(ImproperlyConfigured):
+        runpy.run_path(str(SETTINGS_PATH))
+
+
+@pytest.mark.django_db
+@override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db")
+def test_clear_expired_sessions_in_batches():
+    now = timezone.now()
+    for n in range(5):
+        Session.objects.create(
+            session_key=f"expired{n}", session_data="",
+            expire_date=now - timedelta(days=1),
+        )
+    Session.objects.create(
+        session_key="live", session_data="",
+        expire_date=now + timedelta(days=1),
+    )
+    with CaptureQueriesContext(connection) as queries:
+        call_command("clear_expired_sessions", "--batch-size", "2")
+    deletes = [
+        query for query in queries
+        if query["sql"].startswith("DELETE")
+    ]
+    assert len(deletes) == 3, (
+        "Убедитесь, что истёкшие сессии удаляются порциями по --batch-size."
+    )
+    assert list(Session.objects.values_list("session_key", flat=True)) == [
+        "live"
+    ], "Убедитесь, что удаляются только истёкшие сессии."
+
+
+@pytest.mark.django_db
+@override_settings(
+    SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+)
+def test_clear_expired_sessions_without_db_storage():
+    Session.objects.create(
+        session_key="expired", session_data="",
+        expire_date=timezone.now() - timedelta(days=1),
+    )
+    call_command("clear_expired_sessions")
+    assert Session.objects.exists(), (
+        "Убедитесь, что для хранилища без БД команда ничего не удаляет."
+    )
@@ -0,0 +1,30 @@
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.templatetags.static import static
+
+from core.static import serve
+
+
+def test_collected_static_is_hashed_and_compressed(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": "core.storage.CompressedManifestStaticFilesStorage",
+        },
+    }
+    call_command("collectstatic", interactive=False, verbosity=0)
+
+    url = static("img/fav/favicon.ico")
+    assert url != "/static/img/fav/favicon.ico", (
+        "Убедитесь, что имена собранных файлов содержат хэш содержимого."
+    )
+    path = url.removeprefix("/static/")
+    assert (tmp_path / f"{path}.gz").exists()
+
+    request = RequestFactory().get(url, HTTP_ACCEPT_ENCODING="gzip")
+    response = serve(request, path)
+    assert response["Content-Encoding"] == "gzip"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хэшем в имени отдаются с вечным кэшем."
+    )
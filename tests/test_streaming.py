@@ -0,0 +1,25 @@
+import gzip
+
+import pytest
+
+
+@pytest.mark.django_db
+def test_streaming_feed_matches_regular_page(
+        client, settings, many_posts_with_published_locations
+):
+    regular = client.get("/").content.decode()
+    settings.STREAMING_FEEDS = True
+    response = client.get("/")
+    assert response.streaming, (
+        "Убедитесь, что при STREAMING_FEEDS главная страница отдаётся"
+        " потоком."
+    )
+    streamed = b"".join(response.streaming_content).decode()
+    assert streamed.count('class="card-title"') == regular.count(
+        'class="card-title"'
+    ) == 10
+
+    response = client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    body = gzip.decompress(b"".join(response.streaming_content)).decode()
+    assert body.count('class="card-title"') == 10
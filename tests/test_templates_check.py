@@ -0,0 +1,17 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+def test_project_templates_compile():
+    call_command("warm_templates")
+
+
+def test_broken_template_fails(settings, tmp_path):
+    (tmp_path / "broken.html").write_text("{% if %}")
+    settings.TEMPLATES_DIR = tmp_path
+    settings.TEMPLATES = [{
+        **settings.TEMPLATES[0], "DIRS": [tmp_path],
+    }]
+    with pytest.raises(CommandError):
+        call_command("warm_templates")